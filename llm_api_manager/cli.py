@@ -5,13 +5,135 @@
 提供一个全面的命令行界面（CLI），简化开发者在多模型环境下的工作流程。
 """
 
+import copy
 import os
 import sys
-from typing import Dict, List, Any, Optional, Union, Tuple
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property, lru_cache, wraps
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Any, Optional, Union, Tuple
 
 from .provider_config_manager import ProviderConfigManager
 from .model_test_system import ModelTestSystem
-from .export_utils import ExportUtils
+from .utils.model_list_cache import ModelListCache, remote_models_disabled
+from .utils.helpers import clear_stdin
+
+# 服务商详情中超过该条目数的列表先询问显示方式，而不是直接分页显示
+_LARGE_LIST_THRESHOLD = 200
+
+
+@lru_cache(maxsize=None)
+def _non_empty(message: str) -> Callable[[str], Union[bool, str]]:
+    """
+    获取非空输入校验函数
+    
+    相同提示信息共享同一个校验函数实例
+    
+    Args:
+        message (str): 输入为空时显示的错误信息
+        
+    Returns:
+        Callable[[str], Union[bool, str]]: questionary的validate回调，输入非空时返回True，否则返回错误信息
+    """
+    def validate(text: str) -> Union[bool, str]:
+        return len(text) > 0 or message
+    return validate
+
+
+@lru_cache(maxsize=64)
+def _mask_template(length: int) -> Tuple[str, int]:
+    """
+    获取指定长度API密钥的脱敏模板
+    
+    API密钥长度大多相同，按长度缓存后同一长度的密钥共用一个模板
+    
+    Args:
+        length (int): API密钥长度
+        
+    Returns:
+        Tuple[str, int]: (格式化模板, 首尾各保留的字符数)；保留字符数为0时模板即为脱敏结果
+    """
+    if length > 8:
+        return "{}" + "*" * (length - 8) + "{}", 4
+    return "*" * length, 0
+
+
+def _mask_key(key: str) -> str:
+    """
+    获取API密钥的脱敏显示形式
+    
+    保留前4位和后4位，其余以星号代替；长度不超过8位时全部以星号代替
+    
+    Args:
+        key (str): API密钥
+        
+    Returns:
+        str: 脱敏后的密钥
+    """
+    template, keep = _mask_template(len(key))
+    return template.format(key[:keep], key[-keep:]) if keep else template
+
+
+def _with_provider_selection(prompt: str, back_label: str = "返回", empty_message: str = "没有配置任何服务商"):
+    """
+    服务商选择装饰器
+    
+    被装饰的CLI方法调用时先让用户选择一个服务商，再以provider_name参数调用原方法；
+    没有配置任何服务商或用户选择返回时不调用原方法
+    
+    Args:
+        prompt (str): 选择服务商时的提示信息
+        back_label (str, optional): 返回选项的文字
+        empty_message (str, optional): 没有配置任何服务商时显示的信息
+        
+    Returns:
+        Callable: 装饰器
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self):
+            provider_names = self.config_manager.get_all_provider_names()
+            if not provider_names:
+                print(empty_message)
+                return None
+            
+            provider_name = self.questionary.select(
+                prompt,
+                choices=provider_names + [back_label]
+            ).ask()
+            
+            if provider_name is None or provider_name == back_label:
+                return None
+            
+            return method(self, provider_name)
+        return wrapper
+    return decorator
+
+
+class _StdinFlushingQuestionary:
+    """
+    questionary模块的包装类
+    
+    在创建select/text/confirm提示前先清空标准输入缓冲区，其余属性直接转发给questionary模块。
+    """
+    
+    _PROMPTS = ('select', 'text', 'confirm')
+    
+    def __init__(self, module):
+        self._module = module
+    
+    def __getattr__(self, name):
+        attr = getattr(self._module, name)
+        if name in self._PROMPTS:
+            def prompt(*args, **kwargs):
+                clear_stdin()
+                return attr(*args, **kwargs)
+            attr = prompt
+        
+        # 缓存到实例上，后续访问不再经过__getattr__
+        setattr(self, name, attr)
+        return attr
 
 
 class CLI:
@@ -28,63 +150,155 @@ class CLI:
         # 初始化ProviderConfigManager
         self.config_manager = ProviderConfigManager()
         
-        # 初始化ExportUtils
-        self.export_utils = ExportUtils(self.config_manager)
+        # 初始化自动获取的模型列表缓存
+        self.model_list_cache = ModelListCache()
+        
+        # 复用的ModelTestSystem实例，用于从API获取模型列表；可能被后台线程使用，由锁保护
+        self._test_system = ModelTestSystem()
+        self._fetch_lock = threading.Lock()
         
-        # 导入questionary库
+        # 后台任务线程池及尚未报告结果的后台模型列表获取任务
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._pending_fetches: List[Tuple[str, Future]] = []
+        
+        # 已脱敏API密钥的缓存，键为原始密钥
+        self._mask_cache = {}
+    
+    @cached_property
+    def questionary(self):
+        """
+        questionary模块
+        
+        首次显示交互式菜单时才导入，避免在启动时加载prompt_toolkit；
+        每个提示显示前会清空标准输入缓冲区，丢弃耗时操作期间的误触按键
+        """
         try:
             import questionary
-            from questionary import Choice
-            self.questionary = questionary
-            self.Choice = Choice
         except ImportError:
             print("错误: 未安装questionary库，无法显示交互式菜单。请使用pip install questionary安装。")
             sys.exit(1)
+        return _StdinFlushingQuestionary(questionary)
+    
+    @cached_property
+    def export_utils(self):
+        """
+        ExportUtils实例
+        
+        多数会话只查看或查询配置，首次使用导出功能时才导入导出模块（及其可选依赖）
+        """
+        from .export_utils import ExportUtils
+        return ExportUtils(self.config_manager)
+    
+    @cached_property
+    def Choice(self):
+        """
+        questionary的Choice类
+        """
+        return self.questionary.Choice
+    
+    @cached_property
+    def _api_type_choices(self) -> List[Any]:
+        """
+        API类型选择菜单的选项列表，预设API类型不变，只需构建一次
+        """
+        return [self.Choice(api_type, api_type) for api_type in self.config_manager.SUPPORTED_API_TYPES]
+    
+    @cached_property
+    def _export_method_choices(self) -> List[Any]:
+        """
+        导出方式选择菜单的选项列表，所有导出功能共用
+        """
+        return [
+            self.Choice("导出到文件", "file"),
+            self.Choice("复制到剪贴板", "clipboard"),
+            self.Choice("取消", "cancel")
+        ]
+    
+    @cached_property
+    def _export_model_type_choices(self) -> List[Any]:
+        """
+        导出模型类型选择菜单的选项列表
+        """
+        return [
+            self.Choice("原始模型列表", "original"),
+            self.Choice("映射模型名称列表", "mapped"),
+            self.Choice("取消", "cancel")
+        ]
+    
+    @cached_property
+    def _large_list_choices(self) -> List[Any]:
+        """
+        大列表显示方式选择菜单的选项列表
+        """
+        return [
+            self.Choice("显示第一页", "page"),
+            self.Choice("搜索", "search"),
+            self.Choice("跳过", "skip")
+        ]
     
     def run(self) -> None:
         """
         运行CLI应用程序
         """
-        while True:
-            # 显示主菜单
-            choice = self.questionary.select(
-                "LLM API 管理器 - 主菜单:",
-                choices=[
-                    self.Choice("1. 管理LLM服务商配置", "manage_providers"),
-                    self.Choice("2. 测试LLM模型", "test_models"),
-                    self.Choice("3. 导出配置数据", "export_data"),
-                    self.Choice("4. 查询模型信息", "query_model"),
-                    self.Choice("5. 退出", "exit")
-                ]
-            ).ask()
-            
-            if choice == "manage_providers":
-                self._manage_providers_menu()
-            elif choice == "test_models":
-                self._test_models_menu()
-            elif choice == "export_data":
-                self._export_data_menu()
-            elif choice == "query_model":
-                self._query_model()
-            elif choice == "exit":
-                print("感谢使用LLM API管理器，再见！")
-                break
+        # 菜单选项固定不变，只在进入时构建一次
+        menu_choices = [
+            self.Choice("1. 管理LLM服务商配置", "manage_providers"),
+            self.Choice("2. 测试LLM模型", "test_models"),
+            self.Choice("3. 导出配置数据", "export_data"),
+            self.Choice("4. 查询模型信息", "query_model"),
+            self.Choice("5. 退出", "exit")
+        ]
+        
+        try:
+            while True:
+                self._report_background_fetches()
+                
+                # 显示主菜单
+                choice = self.questionary.select(
+                    "LLM API 管理器 - 主菜单:",
+                    choices=menu_choices
+                ).ask()
+                
+                if choice == "manage_providers":
+                    self._manage_providers_menu()
+                elif choice == "test_models":
+                    self._test_models_menu()
+                elif choice == "export_data":
+                    self._export_data_menu()
+                elif choice == "query_model":
+                    self._query_model()
+                elif choice == "exit":
+                    break
+        finally:
+            # 等待后台任务结束并显示其结果，再关闭获取模型列表时使用的连接
+            if self._pending_fetches:
+                print("正在等待后台模型列表获取任务完成...")
+            self._executor.shutdown(wait=True)
+            self._report_background_fetches()
+            self._test_system.close()
+        
+        print("感谢使用LLM API管理器，再见！")
     
     def _manage_providers_menu(self) -> None:
         """
         服务商配置管理子菜单
         """
+        # 菜单选项固定不变，只在进入时构建一次
+        menu_choices = [
+            self.Choice("1. 添加服务商", "add"),
+            self.Choice("2. 编辑服务商", "edit"),
+            self.Choice("3. 删除服务商", "delete"),
+            self.Choice("4. 查看所有服务商", "list"),
+            self.Choice("5. 查看服务商详情", "view"),
+            self.Choice("6. 返回主菜单", "back")
+        ]
+        
         while True:
+            self._report_background_fetches()
+            
             choice = self.questionary.select(
                 "管理LLM服务商配置:",
-                choices=[
-                    self.Choice("1. 添加服务商", "add"),
-                    self.Choice("2. 编辑服务商", "edit"),
-                    self.Choice("3. 删除服务商", "delete"),
-                    self.Choice("4. 查看所有服务商", "list"),
-                    self.Choice("5. 查看服务商详情", "view"),
-                    self.Choice("6. 返回主菜单", "back")
-                ]
+                choices=menu_choices
             ).ask()
             
             if choice == "add":
@@ -109,7 +323,7 @@ class CLI:
         # 输入服务商名称
         name = self.questionary.text(
             "服务商名称 (必填):",
-            validate=lambda text: len(text) > 0 or "名称不能为空"
+            validate=_non_empty("名称不能为空")
         ).ask()
         
         if not name:
@@ -123,10 +337,7 @@ class CLI:
         # 选择API类型
         api_type = self.questionary.select(
             "API类型 (必填):",
-            choices=[
-                self.Choice(api_type, api_type) 
-                for api_type in self.config_manager.SUPPORTED_API_TYPES
-            ]
+            choices=self._api_type_choices
         ).ask()
         
         # 输入基础URL
@@ -182,7 +393,7 @@ class CLI:
             
             actual_model_id = self.questionary.text(
                 f"实际模型ID (对应 {friendly_name}):",
-                validate=lambda text: len(text) > 0 or "实际模型ID不能为空"
+                validate=_non_empty("实际模型ID不能为空")
             ).ask()
             
             if not actual_model_id:
@@ -206,7 +417,7 @@ class CLI:
             
             header_value = self.questionary.text(
                 f"请求头值 (对应 {header_name}):",
-                validate=lambda text: len(text) > 0 or "请求头值不能为空"
+                validate=_non_empty("请求头值不能为空")
             ).ask()
             
             if not header_value:
@@ -236,68 +447,148 @@ class CLI:
         if self.config_manager.add_provider(provider_config):
             print(f"成功添加服务商: {name}")
             
-            # 如果用户未输入模型列表，尝试自动获取
+            # 如果用户未输入模型列表，在后台尝试自动获取，结果在返回菜单后显示
             if not supported_models and base_url:
-                print("\n检测到未输入模型列表，正在尝试自动获取...")
-                # 创建临时ModelTestSystem实例来获取模型列表
-                test_system = ModelTestSystem(provider_config)
-                if test_system.load_models_for_provider():
-                    # 获取模型ID列表
-                    fetched_models = [model.get('id') for model in test_system.models_data if model.get('id')]
-                    
-                    if fetched_models:
-                        # 更新服务商配置中的模型列表
-                        provider_config['supported_models'] = fetched_models
-                        if self.config_manager.update_provider(name, provider_config):
-                            print(f"成功自动获取并更新了 {len(fetched_models)} 个模型")
-                        else:
-                            print("自动更新模型列表失败")
-                    else:
-                        print("未从API获取到任何模型")
-                else:
-                    print("自动获取模型列表失败，您可以稍后通过编辑功能手动添加")
+                print("\n检测到未输入模型列表，正在后台获取模型列表...")
+                future = self._executor.submit(self._fetch_and_update, name, provider_config)
+                self._pending_fetches.append((name, future))
         else:
             print(f"添加服务商失败: {name}")
     
-    def _edit_provider(self) -> None:
+    def _fetch_and_update(self, name: str, provider_config: Dict[str, Any]) -> List[str]:
         """
-        编辑服务商配置
+        获取新添加服务商的模型列表并写入配置
+        
+        在后台线程中执行，提示信息不直接输出，而是返回给主线程显示
+        
+        Args:
+            name (str): 服务商名称
+            provider_config (Dict[str, Any]): 服务商配置字典
+            
+        Returns:
+            List[str]: 待显示的提示信息列表
         """
-        # 获取所有服务商名称
-        provider_names = self.config_manager.get_all_provider_names()
-        if not provider_names:
-            print("没有配置任何服务商")
-            return
+        messages = []
+        fetched_models = self._fetch_models(provider_config, log=messages.append)
+        
+        if fetched_models is None:
+            messages.append("自动获取模型列表失败，您可以稍后通过编辑功能手动添加")
+        elif fetched_models:
+            # 在批量更新中检查并更新，期间主线程无法修改配置
+            updated = False
+            with self.config_manager.bulk_update() as batch:
+                current_config = self.config_manager.get_provider_config(name)
+                if current_config is None:
+                    messages.append("服务商已被删除或重命名，未更新模型列表")
+                elif current_config.get('supported_models'):
+                    messages.append("模型列表已被手动修改，未使用自动获取的结果")
+                else:
+                    updated = self.config_manager.update_provider(name, {'supported_models': fetched_models})
+                    if not updated:
+                        messages.append("自动更新模型列表失败")
+            
+            if updated:
+                if batch.saved:
+                    messages.append(f"成功自动获取并更新了 {len(fetched_models)} 个模型")
+                else:
+                    messages.append("自动更新模型列表失败")
+        else:
+            messages.append("未从API获取到任何模型")
         
-        # 选择要编辑的服务商
-        provider_name = self.questionary.select(
-            "选择要编辑的服务商:",
-            choices=provider_names + ["返回"]
-        ).ask()
+        return messages
+    
+    def _report_background_fetches(self) -> None:
+        """
+        显示已完成的后台模型列表获取任务的结果
+        """
+        pending = []
+        for name, future in self._pending_fetches:
+            if not future.done():
+                pending.append((name, future))
+                continue
+            
+            try:
+                messages = future.result()
+            except Exception as e:
+                messages = [f"后台获取模型列表时发生错误: {e}"]
+            
+            sys.stdout.write(f"\n服务商 '{name}' 的模型列表自动获取已完成:\n" + "".join(f"{message}\n" for message in messages))
         
-        if provider_name == "返回":
-            return
+        self._pending_fetches = pending
+    
+    def _fetch_models(self, provider_config: Dict[str, Any], log: Callable[[str], None] = print) -> Optional[List[str]]:
+        """
+        获取服务商的模型列表
+        
+        优先使用24小时内的本地缓存；缓存未命中时从API获取并写入缓存，
+        从API获取失败时回退到已过期的缓存。
+        设置环境变量LLM_API_DISABLE_REMOTE_MODELS后只使用本地缓存。
         
-        # 获取当前配置
-        current_config = self.config_manager.get_provider_config(provider_name)
-        if not current_config:
+        Args:
+            provider_config (Dict[str, Any]): 服务商配置字典
+            log (Callable[[str], None], optional): 输出提示信息的函数，默认为print
+            
+        Returns:
+            Optional[List[str]]: 模型ID列表，获取失败时返回None
+        """
+        name = provider_config['name']
+        base_url = provider_config.get('base_url', '')
+        
+        cached_models = self.model_list_cache.get(name, base_url)
+        if cached_models is not None:
+            log(f"已从本地缓存加载 {len(cached_models)} 个模型")
+            return cached_models
+        
+        if remote_models_disabled():
+            log("已禁用从API获取模型列表，仅使用本地缓存")
+        else:
+            with self._fetch_lock:
+                # 忽略配置中已有的模型列表，确保从API获取
+                self._test_system.set_provider(dict(provider_config, supported_models=[]))
+                if self._test_system.load_models_for_provider(log=log):
+                    # 获取模型ID列表
+                    fetched_models = [model.get('id') for model in self._test_system.models_data if model.get('id')]
+                    if fetched_models:
+                        self.model_list_cache.set(name, fetched_models, base_url)
+                    return fetched_models
+        
+        # 回退到已过期的缓存
+        stale_models = self.model_list_cache.get(name, base_url, max_age=None)
+        if stale_models is not None:
+            log(f"使用已过期的本地缓存 ({len(stale_models)} 个模型)")
+        return stale_models
+    
+    @_with_provider_selection("选择要编辑的服务商:")
+    def _edit_provider(self, provider_name: str) -> None:
+        """
+        编辑服务商配置
+        
+        Args:
+            provider_name (str): 选择的服务商名称
+        """
+        # 在配置副本上完成整个编辑会话，期间不持有配置修改锁，后台任务可以正常更新配置
+        original_config = self.config_manager.get_provider_config_copy(provider_name)
+        if not original_config:
             print(f"错误: 无法获取服务商 '{provider_name}' 的配置")
             return
+        current_config = copy.deepcopy(original_config)
+        
+        # 选择要编辑的字段，菜单选项固定不变，只在进入时构建一次
+        field_choices = [
+            self.Choice("名称", "name"),
+            self.Choice("API类型", "api_type"),
+            self.Choice("基础URL", "base_url"),
+            self.Choice("API密钥", "api_keys"),
+            self.Choice("支持的模型列表", "supported_models"),
+            self.Choice("模型映射", "model_mappings"),
+            self.Choice("自定义请求头", "custom_headers"),
+            self.Choice("保存并返回", "save")
+        ]
         
-        # 选择要编辑的字段
         while True:
             field = self.questionary.select(
                 f"编辑服务商 '{provider_name}' - 选择要编辑的字段:",
-                choices=[
-                    self.Choice("名称", "name"),
-                    self.Choice("API类型", "api_type"),
-                    self.Choice("基础URL", "base_url"),
-                    self.Choice("API密钥", "api_keys"),
-                    self.Choice("支持的模型列表", "supported_models"),
-                    self.Choice("模型映射", "model_mappings"),
-                    self.Choice("自定义请求头", "custom_headers"),
-                    self.Choice("保存并返回", "save")
-                ]
+                choices=field_choices
             ).ask()
             
             if field == "save":
@@ -308,7 +599,7 @@ class CLI:
                 new_name = self.questionary.text(
                     "新的服务商名称:",
                     default=current_config['name'],
-                    validate=lambda text: len(text) > 0 or "名称不能为空"
+                    validate=_non_empty("名称不能为空")
                 ).ask()
                 
                 if new_name and new_name != current_config['name']:
@@ -321,10 +612,7 @@ class CLI:
             elif field == "api_type":
                 new_api_type = self.questionary.select(
                     "新的API类型:",
-                    choices=[
-                        self.Choice(api_type, api_type) 
-                        for api_type in self.config_manager.SUPPORTED_API_TYPES
-                    ],
+                    choices=self._api_type_choices,
                     default=current_config['api_type']
                 ).ask()
                 
@@ -343,10 +631,8 @@ class CLI:
                 ).ask()
                 
                 if new_base_url != current_config.get('base_url', ''):
-                    if new_base_url:
-                        current_config['base_url'] = new_base_url
-                    elif 'base_url' in current_config:
-                        del current_config['base_url']
+                    # 清空时保存为空字符串，使该字段作为修改提交
+                    current_config['base_url'] = new_base_url or ''
             
             elif field == "api_keys":
                 self._edit_api_keys(current_config)
@@ -360,9 +646,11 @@ class CLI:
             elif field == "custom_headers":
                 self._edit_custom_headers(current_config)
         
-        # 更新服务商配置
+        # 只提交实际修改过的字段，避免用编辑开始时的旧值覆盖后台任务的更新；
+        # 一次update_provider调用在锁内完成修改并写入配置文件
+        changes = {key: value for key, value in current_config.items() if original_config.get(key) != value}
         original_name = provider_name
-        if self.config_manager.update_provider(original_name, current_config):
+        if self.config_manager.update_provider(original_name, changes):
             print(f"成功更新服务商: {current_config['name']}")
         else:
             print(f"更新服务商失败: {original_name}")
@@ -376,28 +664,28 @@ class CLI:
         """
         api_keys = config.get('api_keys', [])
         
+        # 菜单选项固定不变，只在进入时构建一次
+        action_choices = [
+            self.Choice("添加新密钥", "add"),
+            self.Choice("编辑现有密钥", "edit"),
+            self.Choice("删除密钥", "delete"),
+            self.Choice("完成编辑", "done")
+        ]
+        
         while True:
             # 显示当前API密钥列表
-            print("\n当前API密钥列表:")
-            for i, key in enumerate(api_keys):
-                # 显示部分密钥，保护敏感信息
-                masked_key = key[:4] + "*" * (len(key) - 8) + key[-4:] if len(key) > 8 else "*" * len(key)
-                print(f"{i+1}. {masked_key}")
+            # 显示部分密钥，保护敏感信息
+            sys.stdout.write("\n当前API密钥列表:\n" + "".join(f"{i+1}. {self._mask(key)}\n" for i, key in enumerate(api_keys)))
             
             action = self.questionary.select(
                 "选择操作:",
-                choices=[
-                    self.Choice("添加新密钥", "add"),
-                    self.Choice("编辑现有密钥", "edit"),
-                    self.Choice("删除密钥", "delete"),
-                    self.Choice("完成编辑", "done")
-                ]
+                choices=action_choices
             ).ask()
             
             if action == "add":
                 new_key = self.questionary.text(
                     "输入新的API密钥:",
-                    validate=lambda text: len(text) > 0 or "API密钥不能为空"
+                    validate=_non_empty("API密钥不能为空")
                 ).ask()
                 
                 if new_key:
@@ -406,7 +694,7 @@ class CLI:
             elif action == "edit" and api_keys:
                 index = self.questionary.select(
                     "选择要编辑的密钥:",
-                    choices=[f"{i+1}. {key[:4]}...{key[-4:]}" for i, key in enumerate(api_keys)] + ["取消"]
+                    choices=[f"{i+1}. {self._mask(key)}" for i, key in enumerate(api_keys)] + ["取消"]
                 ).ask()
                 
                 if index != "取消":
@@ -414,10 +702,11 @@ class CLI:
                     new_key = self.questionary.text(
                         "输入新的API密钥:",
                         default=api_keys[i],
-                        validate=lambda text: len(text) > 0 or "API密钥不能为空"
+                        validate=_non_empty("API密钥不能为空")
                     ).ask()
                     
                     if new_key:
+                        self._mask_cache.pop(api_keys[i], None)
                         api_keys[i] = new_key
             
             elif action == "delete" and api_keys:
@@ -427,7 +716,7 @@ class CLI:
                 
                 index = self.questionary.select(
                     "选择要删除的密钥:",
-                    choices=[f"{i+1}. {key[:4]}...{key[-4:]}" for i, key in enumerate(api_keys)] + ["取消"]
+                    choices=[f"{i+1}. {self._mask(key)}" for i, key in enumerate(api_keys)] + ["取消"]
                 ).ask()
                 
                 if index != "取消":
@@ -435,6 +724,7 @@ class CLI:
                     confirm = self.questionary.confirm(f"确定要删除密钥 {i+1} 吗?").ask()
                     
                     if confirm:
+                        self._mask_cache.pop(api_keys[i], None)
                         del api_keys[i]
             
             elif action == "done":
@@ -443,6 +733,24 @@ class CLI:
         # 更新配置
         config['api_keys'] = api_keys
     
+    def _mask(self, key: str) -> str:
+        """
+        获取API密钥的脱敏显示形式
+        
+        结果按原始密钥缓存
+        
+        Args:
+            key (str): API密钥
+            
+        Returns:
+            str: 脱敏后的密钥
+        """
+        masked_key = self._mask_cache.get(key)
+        if masked_key is None:
+            masked_key = _mask_key(key)
+            self._mask_cache[key] = masked_key
+        return masked_key
+    
     def _edit_supported_models(self, config: Dict[str, Any]) -> None:
         """
         编辑支持的模型列表
@@ -451,33 +759,43 @@ class CLI:
             config (Dict[str, Any]): 服务商配置字典
         """
         supported_models = config.get('supported_models', [])
+        # 与列表同步维护的集合，用于O(1)的重复检查
+        seen = set(supported_models)
+        
+        # 菜单选项固定不变，只在进入时构建一次
+        action_choices = [
+            self.Choice("添加新模型", "add"),
+            self.Choice("编辑现有模型", "edit"),
+            self.Choice("删除模型", "delete"),
+            self.Choice("尝试从API自动获取", "fetch"),
+            self.Choice("完成编辑", "done")
+        ]
+        
+        merge_choices = [
+            self.Choice("替换现有列表", "replace"),
+            self.Choice("合并到现有列表", "merge"),
+            self.Choice("取消", "cancel")
+        ]
         
         while True:
             # 显示当前支持的模型列表
-            print("\n当前支持的模型列表:")
-            for i, model in enumerate(supported_models):
-                print(f"{i+1}. {model}")
+            sys.stdout.write("\n当前支持的模型列表:\n" + "".join(f"{i+1}. {model}\n" for i, model in enumerate(supported_models)))
             
             action = self.questionary.select(
                 "选择操作:",
-                choices=[
-                    self.Choice("添加新模型", "add"),
-                    self.Choice("编辑现有模型", "edit"),
-                    self.Choice("删除模型", "delete"),
-                    self.Choice("尝试从API自动获取", "fetch"),
-                    self.Choice("完成编辑", "done")
-                ]
+                choices=action_choices
             ).ask()
             
             if action == "add":
                 new_model = self.questionary.text(
                     "输入新的模型名称:",
-                    validate=lambda text: len(text) > 0 or "模型名称不能为空"
+                    validate=_non_empty("模型名称不能为空")
                 ).ask()
                 
-                if new_model and new_model not in supported_models:
+                if new_model and new_model not in seen:
                     supported_models.append(new_model)
-                elif new_model in supported_models:
+                    seen.add(new_model)
+                elif new_model in seen:
                     print(f"模型 '{new_model}' 已存在")
             
             elif action == "edit" and supported_models:
@@ -491,11 +809,15 @@ class CLI:
                     new_model = self.questionary.text(
                         "输入新的模型名称:",
                         default=supported_models[i],
-                        validate=lambda text: len(text) > 0 or "模型名称不能为空"
+                        validate=_non_empty("模型名称不能为空")
                     ).ask()
                     
                     if new_model:
+                        old_model = supported_models[i]
                         supported_models[i] = new_model
+                        if old_model not in supported_models:
+                            seen.discard(old_model)
+                        seen.add(new_model)
             
             elif action == "delete" and supported_models:
                 index = self.questionary.select(
@@ -508,38 +830,35 @@ class CLI:
                     confirm = self.questionary.confirm(f"确定要删除模型 '{supported_models[i]}' 吗?").ask()
                     
                     if confirm:
-                        del supported_models[i]
+                        removed_model = supported_models.pop(i)
+                        if removed_model not in supported_models:
+                            seen.discard(removed_model)
             
             elif action == "fetch":
                 print("尝试从API自动获取模型列表...")
                 
-                # 创建临时ModelTestSystem实例来获取模型列表
-                test_system = ModelTestSystem(config)
-                if test_system.load_models_for_provider():
-                    # 获取模型ID列表
-                    fetched_models = [model.get('id') for model in test_system.models_data if model.get('id')]
-                    
+                fetched_models = self._fetch_models(config)
+                if fetched_models is not None:
                     if fetched_models:
                         # 询问是否替换或合并
                         if supported_models:
                             merge_action = self.questionary.select(
                                 "已从API获取模型列表，请选择操作:",
-                                choices=[
-                                    self.Choice("替换现有列表", "replace"),
-                                    self.Choice("合并到现有列表", "merge"),
-                                    self.Choice("取消", "cancel")
-                                ]
+                                choices=merge_choices
                             ).ask()
                             
                             if merge_action == "replace":
                                 supported_models = fetched_models
+                                seen = set(supported_models)
                             elif merge_action == "merge":
                                 # 合并列表，去除重复项
                                 for model in fetched_models:
-                                    if model not in supported_models:
+                                    if model not in seen:
                                         supported_models.append(model)
+                                        seen.add(model)
                         else:
                             supported_models = fetched_models
+                            seen = set(supported_models)
                         
                         print(f"成功获取 {len(fetched_models)} 个模型")
                     else:
@@ -559,27 +878,41 @@ class CLI:
             config (Dict[str, Any]): 服务商配置字典
         """
         model_mappings = config.get('model_mappings', {})
+        # 映射列表及其显示文本仅在映射被修改后重建
+        dirty = True
+        
+        # 菜单选项固定不变，只在进入时构建一次
+        action_choices = [
+            self.Choice("添加新映射", "add"),
+            self.Choice("编辑现有映射", "edit"),
+            self.Choice("删除映射", "delete"),
+            self.Choice("完成编辑", "done")
+        ]
+        
+        field_choices = [
+            self.Choice("友好名称", "friendly_name"),
+            self.Choice("实际模型ID", "actual_id"),
+            self.Choice("取消", "cancel")
+        ]
         
         while True:
+            if dirty:
+                mapping_list = list(model_mappings.items())
+                mapping_lines = [f"{i+1}. {name} -> {id}" for i, (name, id) in enumerate(mapping_list)]
+                dirty = False
+            
             # 显示当前模型映射
-            print("\n当前模型映射:")
-            for i, (friendly_name, actual_id) in enumerate(model_mappings.items()):
-                print(f"{i+1}. {friendly_name} -> {actual_id}")
+            sys.stdout.write("\n当前模型映射:\n" + "".join(f"{line}\n" for line in mapping_lines))
             
             action = self.questionary.select(
                 "选择操作:",
-                choices=[
-                    self.Choice("添加新映射", "add"),
-                    self.Choice("编辑现有映射", "edit"),
-                    self.Choice("删除映射", "delete"),
-                    self.Choice("完成编辑", "done")
-                ]
+                choices=action_choices
             ).ask()
             
             if action == "add":
                 friendly_name = self.questionary.text(
                     "输入友好名称:",
-                    validate=lambda text: len(text) > 0 or "友好名称不能为空"
+                    validate=_non_empty("友好名称不能为空")
                 ).ask()
                 
                 if not friendly_name:
@@ -591,18 +924,17 @@ class CLI:
                 
                 actual_id = self.questionary.text(
                     f"输入实际模型ID (对应 {friendly_name}):",
-                    validate=lambda text: len(text) > 0 or "实际模型ID不能为空"
+                    validate=_non_empty("实际模型ID不能为空")
                 ).ask()
                 
                 if actual_id:
                     model_mappings[friendly_name] = actual_id
+                    dirty = True
             
             elif action == "edit" and model_mappings:
-                # 准备选项列表
-                mapping_list = list(model_mappings.items())
                 index = self.questionary.select(
                     "选择要编辑的映射:",
-                    choices=[f"{i+1}. {name} -> {id}" for i, (name, id) in enumerate(mapping_list)] + ["取消"]
+                    choices=mapping_lines + ["取消"]
                 ).ask()
                 
                 if index != "取消":
@@ -611,18 +943,14 @@ class CLI:
                     
                     edit_field = self.questionary.select(
                         "编辑哪个字段:",
-                        choices=[
-                            self.Choice("友好名称", "friendly_name"),
-                            self.Choice("实际模型ID", "actual_id"),
-                            self.Choice("取消", "cancel")
-                        ]
+                        choices=field_choices
                     ).ask()
                     
                     if edit_field == "friendly_name":
                         new_name = self.questionary.text(
                             "输入新的友好名称:",
                             default=friendly_name,
-                            validate=lambda text: len(text) > 0 or "友好名称不能为空"
+                            validate=_non_empty("友好名称不能为空")
                         ).ask()
                         
                         if new_name and new_name != friendly_name:
@@ -632,23 +960,23 @@ class CLI:
                                 # 删除旧映射并添加新映射
                                 del model_mappings[friendly_name]
                                 model_mappings[new_name] = actual_id
+                                dirty = True
                     
                     elif edit_field == "actual_id":
                         new_id = self.questionary.text(
                             "输入新的实际模型ID:",
                             default=actual_id,
-                            validate=lambda text: len(text) > 0 or "实际模型ID不能为空"
+                            validate=_non_empty("实际模型ID不能为空")
                         ).ask()
                         
                         if new_id:
                             model_mappings[friendly_name] = new_id
+                            dirty = True
             
             elif action == "delete" and model_mappings:
-                # 准备选项列表
-                mapping_list = list(model_mappings.items())
                 index = self.questionary.select(
                     "选择要删除的映射:",
-                    choices=[f"{i+1}. {name} -> {id}" for i, (name, id) in enumerate(mapping_list)] + ["取消"]
+                    choices=mapping_lines + ["取消"]
                 ).ask()
                 
                 if index != "取消":
@@ -659,6 +987,7 @@ class CLI:
                     
                     if confirm:
                         del model_mappings[friendly_name]
+                        dirty = True
             
             elif action == "done":
                 break
@@ -677,27 +1006,41 @@ class CLI:
             config (Dict[str, Any]): 服务商配置字典
         """
         custom_headers = config.get('custom_headers', {})
+        # 请求头列表及其显示文本仅在请求头被修改后重建
+        dirty = True
+        
+        # 菜单选项固定不变，只在进入时构建一次
+        action_choices = [
+            self.Choice("添加新请求头", "add"),
+            self.Choice("编辑现有请求头", "edit"),
+            self.Choice("删除请求头", "delete"),
+            self.Choice("完成编辑", "done")
+        ]
+        
+        field_choices = [
+            self.Choice("请求头名称", "header_name"),
+            self.Choice("请求头值", "header_value"),
+            self.Choice("取消", "cancel")
+        ]
         
         while True:
+            if dirty:
+                header_list = list(custom_headers.items())
+                header_lines = [f"{i+1}. {name}: {value}" for i, (name, value) in enumerate(header_list)]
+                dirty = False
+            
             # 显示当前自定义请求头
-            print("\n当前自定义请求头:")
-            for i, (name, value) in enumerate(custom_headers.items()):
-                print(f"{i+1}. {name}: {value}")
+            sys.stdout.write("\n当前自定义请求头:\n" + "".join(f"{line}\n" for line in header_lines))
             
             action = self.questionary.select(
                 "选择操作:",
-                choices=[
-                    self.Choice("添加新请求头", "add"),
-                    self.Choice("编辑现有请求头", "edit"),
-                    self.Choice("删除请求头", "delete"),
-                    self.Choice("完成编辑", "done")
-                ]
+                choices=action_choices
             ).ask()
             
             if action == "add":
                 header_name = self.questionary.text(
                     "输入请求头名称:",
-                    validate=lambda text: len(text) > 0 or "请求头名称不能为空"
+                    validate=_non_empty("请求头名称不能为空")
                 ).ask()
                 
                 if not header_name:
@@ -709,18 +1052,17 @@ class CLI:
                 
                 header_value = self.questionary.text(
                     f"输入请求头值 (对应 {header_name}):",
-                    validate=lambda text: len(text) > 0 or "请求头值不能为空"
+                    validate=_non_empty("请求头值不能为空")
                 ).ask()
                 
                 if header_value:
                     custom_headers[header_name] = header_value
+                    dirty = True
             
             elif action == "edit" and custom_headers:
-                # 准备选项列表
-                header_list = list(custom_headers.items())
                 index = self.questionary.select(
                     "选择要编辑的请求头:",
-                    choices=[f"{i+1}. {name}: {value}" for i, (name, value) in enumerate(header_list)] + ["取消"]
+                    choices=header_lines + ["取消"]
                 ).ask()
                 
                 if index != "取消":
@@ -729,18 +1071,14 @@ class CLI:
                     
                     edit_field = self.questionary.select(
                         "编辑哪个字段:",
-                        choices=[
-                            self.Choice("请求头名称", "header_name"),
-                            self.Choice("请求头值", "header_value"),
-                            self.Choice("取消", "cancel")
-                        ]
+                        choices=field_choices
                     ).ask()
                     
                     if edit_field == "header_name":
                         new_name = self.questionary.text(
                             "输入新的请求头名称:",
                             default=header_name,
-                            validate=lambda text: len(text) > 0 or "请求头名称不能为空"
+                            validate=_non_empty("请求头名称不能为空")
                         ).ask()
                         
                         if new_name and new_name != header_name:
@@ -750,23 +1088,23 @@ class CLI:
                                 # 删除旧请求头并添加新请求头
                                 del custom_headers[header_name]
                                 custom_headers[new_name] = header_value
+                                dirty = True
                     
                     elif edit_field == "header_value":
                         new_value = self.questionary.text(
                             "输入新的请求头值:",
                             default=header_value,
-                            validate=lambda text: len(text) > 0 or "请求头值不能为空"
+                            validate=_non_empty("请求头值不能为空")
                         ).ask()
                         
                         if new_value:
                             custom_headers[header_name] = new_value
+                            dirty = True
             
             elif action == "delete" and custom_headers:
-                # 准备选项列表
-                header_list = list(custom_headers.items())
                 index = self.questionary.select(
                     "选择要删除的请求头:",
-                    choices=[f"{i+1}. {name}: {value}" for i, (name, value) in enumerate(header_list)] + ["取消"]
+                    choices=header_lines + ["取消"]
                 ).ask()
                 
                 if index != "取消":
@@ -777,6 +1115,7 @@ class CLI:
                     
                     if confirm:
                         del custom_headers[header_name]
+                        dirty = True
             
             elif action == "done":
                 break
@@ -787,25 +1126,14 @@ class CLI:
         elif 'custom_headers' in config:
             del config['custom_headers']
     
-    def _delete_provider(self) -> None:
+    @_with_provider_selection("选择要删除的服务商:")
+    def _delete_provider(self, provider_name: str) -> None:
         """
         删除服务商配置
-        """
-        # 获取所有服务商名称
-        provider_names = self.config_manager.get_all_provider_names()
-        if not provider_names:
-            print("没有配置任何服务商")
-            return
-        
-        # 选择要删除的服务商
-        provider_name = self.questionary.select(
-            "选择要删除的服务商:",
-            choices=provider_names + ["返回"]
-        ).ask()
-        
-        if provider_name == "返回":
-            return
         
+        Args:
+            provider_name (str): 选择的服务商名称
+        """
         # 确认删除
         confirm = self.questionary.confirm(f"确定要删除服务商 '{provider_name}' 吗? 此操作不可撤销!").ask()
         
@@ -824,98 +1152,147 @@ class CLI:
             print("没有配置任何服务商")
             return
         
-        print("\n所有服务商:")
-        for i, name in enumerate(provider_names):
-            print(f"{i+1}. {name}")
+        sys.stdout.write("\n所有服务商:\n" + "".join(f"{i+1}. {name}\n" for i, name in enumerate(provider_names)))
     
-    def _view_provider(self) -> None:
+    @_with_provider_selection("选择要查看的服务商:")
+    def _view_provider(self, provider_name: str) -> None:
         """
         查看服务商详情
-        """
-        # 获取所有服务商名称
-        provider_names = self.config_manager.get_all_provider_names()
-        if not provider_names:
-            print("没有配置任何服务商")
-            return
-        
-        # 选择要查看的服务商
-        provider_name = self.questionary.select(
-            "选择要查看的服务商:",
-            choices=provider_names + ["返回"]
-        ).ask()
-        
-        if provider_name == "返回":
-            return
         
+        Args:
+            provider_name (str): 选择的服务商名称
+        """
         # 获取服务商配置
         config = self.config_manager.get_provider_config(provider_name)
         if not config:
             print(f"错误: 无法获取服务商 '{provider_name}' 的配置")
             return
         
-        # 显示服务商详情
-        print(f"\n服务商 '{provider_name}' 详情:")
-        print(f"API类型: {config['api_type']}")
+        # 显示服务商详情，所有行拼接后一次写出
+        lines = [f"\n服务商 '{provider_name}' 详情:", f"API类型: {config['api_type']}"]
         
         if 'base_url' in config:
-            print(f"基础URL: {config['base_url']}")
+            lines.append(f"基础URL: {config['base_url']}")
         
         # 显示API密钥（部分隐藏）
-        print("API密钥:")
-        for i, key in enumerate(config.get('api_keys', [])):
-            masked_key = key[:4] + "*" * (len(key) - 8) + key[-4:] if len(key) > 8 else "*" * len(key)
-            print(f"  {i+1}. {masked_key}")
+        lines.append("API密钥:")
+        lines.extend(f"  {i+1}. {_mask_key(key)}" for i, key in enumerate(config.get('api_keys', [])))
+        sys.stdout.write("\n".join(lines) + "\n")
         
         # 显示支持的模型
         supported_models = config.get('supported_models', [])
-        if supported_models:
-            print(f"支持的模型 ({len(supported_models)}):")
-            for i, model in enumerate(supported_models[:10]):  # 只显示前10个
-                print(f"  {i+1}. {model}")
-            if len(supported_models) > 10:
-                print(f"  ... 还有 {len(supported_models) - 10} 个模型")
-        else:
-            print("支持的模型: 无")
+        self._browse_pages(
+            "支持的模型",
+            lambda offset, limit: self.config_manager.get_provider_models_page(provider_name, offset, limit),
+            str,
+            search=lambda query: (model for model in supported_models if query in model)
+        )
         
         # 显示模型映射
         model_mappings = config.get('model_mappings', {})
-        if model_mappings:
-            print(f"模型映射 ({len(model_mappings)}):")
-            for i, (name, id) in enumerate(list(model_mappings.items())[:10]):  # 只显示前10个
-                print(f"  {i+1}. {name} -> {id}")
-            if len(model_mappings) > 10:
-                print(f"  ... 还有 {len(model_mappings) - 10} 个映射")
-        else:
-            print("模型映射: 无")
+        self._browse_pages(
+            "模型映射",
+            lambda offset, limit: self.config_manager.get_provider_mappings_page(provider_name, offset, limit),
+            lambda item: f"{item[0]} -> {item[1]}",
+            search=lambda query: (item for item in model_mappings.items() if query in item[0] or query in item[1])
+        )
         
         # 显示自定义请求头
         custom_headers = config.get('custom_headers', {})
         if custom_headers:
-            print(f"自定义请求头 ({len(custom_headers)}):")
-            for name, value in custom_headers.items():
-                print(f"  {name}: {value}")
+            lines = [f"自定义请求头 ({len(custom_headers)}):"]
+            lines.extend(f"  {name}: {value}" for name, value in custom_headers.items())
+            sys.stdout.write("\n".join(lines) + "\n")
         else:
             print("自定义请求头: 无")
     
-    def _test_models_menu(self) -> None:
-        """
-        模型测试子菜单
+    def _browse_pages(self, title: str, fetch_page: Callable[[int, int], Optional[Tuple[int, list]]], format_item: Callable[[Any], str], search: Optional[Callable[[str], Iterable]] = None, page_size: int = 10) -> None:
         """
-        # 获取所有服务商名称
-        provider_names = self.config_manager.get_all_provider_names()
-        if not provider_names:
-            print("没有配置任何服务商，请先添加服务商配置")
-            return
+        分页显示列表，条目超过一页时提供翻页选项
         
-        # 选择服务商
-        provider_name = self.questionary.select(
-            "选择要测试的服务商:",
-            choices=provider_names + ["返回主菜单"]
-        ).ask()
+        提供search时，条目数超过_LARGE_LIST_THRESHOLD的列表先询问显示第一页、搜索还是跳过
         
-        if provider_name == "返回主菜单":
-            return
+        Args:
+            title (str): 列表标题
+            fetch_page (Callable[[int, int], Optional[Tuple[int, list]]]): 按(起始位置, 条目数)获取(条目总数, 当前页条目)的函数
+            format_item (Callable[[Any], str]): 条目格式化函数
+            search (Optional[Callable[[str], Iterable]], optional): 按关键字返回匹配条目的函数
+            page_size (int, optional): 每页条目数
+        """
+        if search is not None:
+            total, _ = fetch_page(0, 0) or (0, [])
+            if total > _LARGE_LIST_THRESHOLD:
+                action = self.questionary.select(
+                    f"{title}共有 {total} 项，请选择显示方式:",
+                    choices=self._large_list_choices
+                ).ask()
+                
+                if action == "search":
+                    query = self.questionary.text(
+                        f"输入要在{title}中搜索的关键字:",
+                        validate=_non_empty("关键字不能为空")
+                    ).ask()
+                    if not query:
+                        return
+                    
+                    # 多取一项用于判断是否还有更多匹配项
+                    matches = list(islice(search(query), page_size + 1))
+                    if not matches:
+                        print(f"{title}中没有包含 '{query}' 的条目")
+                        return
+                    lines = [f"{title}中包含 '{query}' 的条目:"]
+                    lines.extend(f"  {i}. {format_item(item)}" for i, item in enumerate(matches[:page_size], 1))
+                    if len(matches) > page_size:
+                        lines.append(f"  ... 仅显示前 {page_size} 个匹配项")
+                    sys.stdout.write("\n".join(lines) + "\n")
+                    return
+                
+                if action != "page":
+                    print(f"{title} ({total}): 已跳过")
+                    return
+        
+        offset = 0
+        while True:
+            total, page = fetch_page(offset, page_size) or (0, [])
+            if not total:
+                print(f"{title}: 无")
+                return
+            
+            page_count = (total + page_size - 1) // page_size
+            if page_count > 1:
+                lines = [f"{title} ({total}) 第 {offset // page_size + 1}/{page_count} 页:"]
+            else:
+                lines = [f"{title} ({total}):"]
+            lines.extend(f"  {i}. {format_item(item)}" for i, item in enumerate(page, offset + 1))
+            sys.stdout.write("\n".join(lines) + "\n")
+            
+            if page_count == 1:
+                return
+            
+            # 翻页选项随当前页变化
+            page_choices = []
+            if offset + page_size < total:
+                page_choices.append(self.Choice("下一页", "next"))
+            if offset > 0:
+                page_choices.append(self.Choice("上一页", "prev"))
+            page_choices.append(self.Choice("返回", "back"))
+            
+            action = self.questionary.select(f"{title}翻页:", choices=page_choices).ask()
+            if action == "next":
+                offset += page_size
+            elif action == "prev":
+                offset -= page_size
+            else:
+                return
+    
+    @_with_provider_selection("选择要测试的服务商:", back_label="返回主菜单", empty_message="没有配置任何服务商，请先添加服务商配置")
+    def _test_models_menu(self, provider_name: str) -> None:
+        """
+        模型测试子菜单
         
+        Args:
+            provider_name (str): 选择的服务商名称
+        """
         # 获取服务商配置
         provider_config = self.config_manager.get_provider_config(provider_name)
         if not provider_config:
@@ -925,36 +1302,43 @@ class CLI:
         # 实例化ModelTestSystem
         test_system = ModelTestSystem(provider_config)
         
-        # 加载模型
-        print(f"正在加载服务商 '{provider_name}' 的模型...")
-        if not test_system.load_models_for_provider():
-            print("加载模型失败，请检查服务商配置或网络连接")
-            return
-        
-        # 选择模型进行测试
-        models_to_test = test_system._select_models_for_testing()
-        if not models_to_test:
-            print("未选择任何模型进行测试")
-            return
-        
-        # 执行测试
-        print(f"开始测试 {len(models_to_test)} 个模型...")
-        test_system.run_tests(models_to_test)
+        try:
+            # 加载模型
+            print(f"正在加载服务商 '{provider_name}' 的模型...")
+            if not test_system.load_models_for_provider():
+                print("加载模型失败，请检查服务商配置或网络连接")
+                return
+            
+            # 选择模型进行测试
+            models_to_test = test_system._select_models_for_testing()
+            if not models_to_test:
+                print("未选择任何模型进行测试")
+                return
+            
+            # 执行测试
+            print(f"开始测试 {len(models_to_test)} 个模型...")
+            test_system.run_tests(models_to_test)
+        finally:
+            # 关闭测试期间保持的keep-alive连接
+            test_system.close()
     
     def _export_data_menu(self) -> None:
         """
         导出配置数据子菜单
         """
+        # 菜单选项固定不变，只在进入时构建一次
+        menu_choices = [
+            self.Choice("1. 导出指定服务商的模型映射", "export_mappings"),
+            self.Choice("2. 导出指定服务商的支持模型列表", "export_models"),
+            self.Choice("3. 导出所有服务商的API Key及请求地址", "export_api_keys"),
+            self.Choice("4. 导出所有服务商的完整配置", "export_all"),
+            self.Choice("5. 返回主菜单", "back")
+        ]
+        
         while True:
             choice = self.questionary.select(
                 "导出配置数据:",
-                choices=[
-                    self.Choice("1. 导出指定服务商的模型映射", "export_mappings"),
-                    self.Choice("2. 导出指定服务商的支持模型列表", "export_models"),
-                    self.Choice("3. 导出所有服务商的API Key及请求地址", "export_api_keys"),
-                    self.Choice("4. 导出所有服务商的完整配置", "export_all"),
-                    self.Choice("5. 返回主菜单", "back")
-                ]
+                choices=menu_choices
             ).ask()
             
             if choice == "export_mappings":
@@ -968,33 +1352,18 @@ class CLI:
             elif choice == "back":
                 break
     
-    def _export_model_mappings(self) -> None:
+    @_with_provider_selection("选择要导出模型映射的服务商:")
+    def _export_model_mappings(self, provider_name: str) -> None:
         """
         导出指定服务商的模型映射
-        """
-        # 获取所有服务商名称
-        provider_names = self.config_manager.get_all_provider_names()
-        if not provider_names:
-            print("没有配置任何服务商")
-            return
-        
-        # 选择服务商
-        provider_name = self.questionary.select(
-            "选择要导出模型映射的服务商:",
-            choices=provider_names + ["返回"]
-        ).ask()
-        
-        if provider_name == "返回":
-            return
         
+        Args:
+            provider_name (str): 选择的服务商名称
+        """
         # 选择导出方式
         export_method = self.questionary.select(
             "选择导出方式:",
-            choices=[
-                self.Choice("导出到文件", "file"),
-                self.Choice("复制到剪贴板", "clipboard"),
-                self.Choice("取消", "cancel")
-            ]
+            choices=self._export_method_choices
         ).ask()
         
         if export_method == "cancel":
@@ -1004,33 +1373,18 @@ class CLI:
         to_clipboard = (export_method == "clipboard")
         self.export_utils.export_model_mappings(provider_name, to_clipboard)
     
-    def _export_supported_models(self) -> None:
+    @_with_provider_selection("选择要导出模型列表的服务商:")
+    def _export_supported_models(self, provider_name: str) -> None:
         """
         导出指定服务商的支持模型列表
-        """
-        # 获取所有服务商名称
-        provider_names = self.config_manager.get_all_provider_names()
-        if not provider_names:
-            print("没有配置任何服务商")
-            return
-        
-        # 选择服务商
-        provider_name = self.questionary.select(
-            "选择要导出模型列表的服务商:",
-            choices=provider_names + ["返回"]
-        ).ask()
-        
-        if provider_name == "返回":
-            return
         
+        Args:
+            provider_name (str): 选择的服务商名称
+        """
         # 选择模型类型
         model_type = self.questionary.select(
             "选择要导出的模型类型:",
-            choices=[
-                self.Choice("原始模型列表", "original"),
-                self.Choice("映射模型名称列表", "mapped"),
-                self.Choice("取消", "cancel")
-            ]
+            choices=self._export_model_type_choices
         ).ask()
         
         if model_type == "cancel":
@@ -1039,11 +1393,7 @@ class CLI:
         # 选择导出方式
         export_method = self.questionary.select(
             "选择导出方式:",
-            choices=[
-                self.Choice("导出到文件", "file"),
-                self.Choice("复制到剪贴板", "clipboard"),
-                self.Choice("取消", "cancel")
-            ]
+            choices=self._export_method_choices
         ).ask()
         
         if export_method == "cancel":
@@ -1061,11 +1411,7 @@ class CLI:
         # 选择导出方式
         export_method = self.questionary.select(
             "选择导出方式:",
-            choices=[
-                self.Choice("导出到文件", "file"),
-                self.Choice("复制到剪贴板", "clipboard"),
-                self.Choice("取消", "cancel")
-            ]
+            choices=self._export_method_choices
         ).ask()
         
         if export_method == "cancel":
@@ -1082,11 +1428,7 @@ class CLI:
         # 选择导出方式
         export_method = self.questionary.select(
             "选择导出方式:",
-            choices=[
-                self.Choice("导出到文件", "file"),
-                self.Choice("复制到剪贴板", "clipboard"),
-                self.Choice("取消", "cancel")
-            ]
+            choices=self._export_method_choices
         ).ask()
         
         if export_method == "cancel":
@@ -1103,7 +1445,7 @@ class CLI:
         # 输入模型名称
         model_name = self.questionary.text(
             "输入要查询的模型名称 (原始名称或映射名称):",
-            validate=lambda text: len(text) > 0 or "模型名称不能为空"
+            validate=_non_empty("模型名称不能为空")
         ).ask()
         
         if not model_name:
@@ -1116,25 +1458,24 @@ class CLI:
             print(f"未找到提供模型 '{model_name}' 的服务商")
             return
         
-        # 显示结果
-        print(f"\n找到 {len(providers)} 个提供模型 '{model_name}' 的服务商:")
+        # 显示结果，所有行拼接后一次写出
+        lines = [f"\n找到 {len(providers)} 个提供模型 '{model_name}' 的服务商:"]
         for i, provider in enumerate(providers):
-            print(f"\n{i+1}. 服务商: {provider['provider_name']}")
-            print(f"   实际模型名称: {provider['actual_model_name']}")
-            print(f"   基础URL: {provider['base_url'] or '默认'}")
+            lines.append(f"\n{i+1}. 服务商: {provider['provider_name']}")
+            lines.append(f"   实际模型名称: {provider['actual_model_name']}")
+            lines.append(f"   基础URL: {provider['base_url'] or '默认'}")
             
             # 显示API密钥（部分隐藏）
             api_key = provider['api_key']
             if api_key:
-                masked_key = api_key[:4] + "*" * (len(api_key) - 8) + api_key[-4:] if len(api_key) > 8 else "*" * len(api_key)
-                print(f"   API密钥: {masked_key}")
+                lines.append(f"   API密钥: {_mask_key(api_key)}")
             
             # 显示自定义请求头
             custom_headers = provider.get('custom_headers', {})
             if custom_headers:
-                print("   自定义请求头:")
-                for name, value in custom_headers.items():
-                    print(f"     {name}: {value}")
+                lines.append("   自定义请求头:")
+                lines.extend(f"     {name}: {value}" for name, value in custom_headers.items())
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -6,10 +6,25 @@
 """
 
 import os
-import json
 from typing import Dict, List, Any, Optional, Union
 
-from .utils.helpers import save_to_json, generate_filename, copy_to_clipboard
+from .utils.helpers import save_to_json, generate_filename, copy_to_clipboard, clipboard_available, dump_json_bytes
+
+# 默认导出目录（项目根目录下的exports），模块导入时计算一次
+_EXPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'exports')
+
+
+def _dumps(obj: Any) -> str:
+    """
+    将数据转换为缩进格式的JSON字符串
+    
+    Args:
+        obj (Any): 要转换的数据
+        
+    Returns:
+        str: JSON字符串
+    """
+    return dump_json_bytes(obj, indent=True).decode('utf-8')
 
 
 class ExportUtils:
@@ -19,6 +34,9 @@ class ExportUtils:
     提供各种导出功能，用于操作由ProviderConfigManager管理的数据。
     """
     
+    # 导出目录是否已确认存在（进程内只需创建一次）
+    _export_dir_ready = False
+    
     def __init__(self, provider_config_manager):
         """
         初始化导出功能工具类
@@ -28,10 +46,38 @@ class ExportUtils:
         """
         self.manager = provider_config_manager
         
-        # 确保导出目录存在
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.export_dir = os.path.join(base_dir, 'exports')
-        os.makedirs(self.export_dir, exist_ok=True)
+        # 导出目录在首次导出到文件时才创建
+        self.export_dir = _EXPORT_DIR
+    
+    def _ensure_export_dir(self) -> bool:
+        """
+        确保导出目录存在（JSON导出由save_to_json自行创建目录，只有直接写入文件的导出需要调用）
+        
+        Returns:
+            bool: 目录已存在或创建成功返回True，创建失败时给出提示并返回False
+        """
+        if not ExportUtils._export_dir_ready:
+            try:
+                os.makedirs(self.export_dir, exist_ok=True)
+            except OSError as e:
+                print(f"导出失败: 无法创建导出目录 {self.export_dir}: {e}")
+                return False
+            ExportUtils._export_dir_ready = True
+        return True
+    
+    def _check_clipboard(self) -> bool:
+        """
+        检查剪贴板是否可用，不可用时给出提示
+        
+        在转换导出内容之前调用，避免为无法完成的复制做无用的序列化
+        
+        Returns:
+            bool: 剪贴板可用返回True，否则返回False
+        """
+        if clipboard_available():
+            return True
+        print("错误: 剪贴板不可用，请确认已安装pyperclip（pip install pyperclip）及系统剪贴板工具，或选择导出到文件")
+        return False
     
     def export_model_mappings(self, provider_name: str, to_clipboard: bool = False) -> Optional[str]:
         """
@@ -54,12 +100,11 @@ class ExportUtils:
             print(f"警告: 服务商 '{provider_name}' 没有定义任何模型映射")
             return None
         
-        # 转换为JSON字符串
-        json_str = json.dumps(model_mappings, ensure_ascii=False, indent=2)
-        
         if to_clipboard:
-            # 复制到剪贴板
-            if copy_to_clipboard(json_str):
+            # 复制到剪贴板，只有此时才需要转换为JSON字符串；导出到文件时由save_to_json直接写入文件
+            if not self._check_clipboard():
+                return None
+            if copy_to_clipboard(_dumps(model_mappings)):
                 print(f"服务商 '{provider_name}' 的模型映射已复制到剪贴板")
             return None
         else:
@@ -95,23 +140,29 @@ class ExportUtils:
             print(f"警告: 服务商 '{provider_name}' 没有{'映射' if use_mappings else '支持'}的模型")
             return None
         
-        # 转换为逗号分隔的字符串
-        models_str = ",".join(models)
-        
         if to_clipboard:
             # 复制到剪贴板
-            if copy_to_clipboard(models_str):
+            if not self._check_clipboard():
+                return None
+            if copy_to_clipboard(",".join(models)):
                 print(f"服务商 '{provider_name}' 的{'映射' if use_mappings else '支持'}模型列表已复制到剪贴板")
             return None
         else:
             # 导出到文件
+            if not self._ensure_export_dir():
+                return None
             type_str = "mapped" if use_mappings else "supported"
             filename = f"{provider_name}_{type_str}_models.txt"
             filepath = os.path.join(self.export_dir, filename)
             
             try:
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(models_str)
+                # 逐个写入逗号分隔的模型名称，不在内存中拼接完整字符串
+                with open(filepath, 'wb', buffering=1 << 16) as f:
+                    it = iter(models)
+                    f.write(next(it).encode('utf-8'))
+                    for model in it:
+                        f.write(b',')
+                        f.write(model.encode('utf-8'))
                 print(f"服务商 '{provider_name}' 的{'映射' if use_mappings else '支持'}模型列表已导出到: {filepath}")
                 return filepath
             except Exception as e:
@@ -134,12 +185,11 @@ class ExportUtils:
             print("警告: 没有配置任何服务商")
             return None
         
-        # 转换为JSON字符串
-        json_str = json.dumps(api_info, ensure_ascii=False, indent=2)
-        
         if to_clipboard:
             # 复制到剪贴板
-            if copy_to_clipboard(json_str):
+            if not self._check_clipboard():
+                return None
+            if copy_to_clipboard(_dumps(api_info)):
                 print("所有服务商的API Key及请求地址已复制到剪贴板")
             return None
         else:
@@ -169,12 +219,11 @@ class ExportUtils:
             print("警告: 没有配置任何服务商")
             return None
         
-        # 转换为JSON字符串
-        json_str = json.dumps(all_configs, ensure_ascii=False, indent=2)
-        
         if to_clipboard:
             # 复制到剪贴板
-            if copy_to_clipboard(json_str):
+            if not self._check_clipboard():
+                return None
+            if copy_to_clipboard(_dumps(all_configs)):
                 print("所有服务商的完整配置已复制到剪贴板")
             return None
         else:
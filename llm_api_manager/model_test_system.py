@@ -6,16 +6,18 @@
 """
 
 import http.client
-import json
+import os
+import random
+import sys
 import time
 import threading
 import csv
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
-from urllib.parse import urlparse
+from operator import itemgetter
+from typing import IO, Callable, Dict, List, Any, Optional, Tuple
 
-from .utils.helpers import clear_console, extract_domain, format_timestamp, generate_filename, create_progress_bar
+from .utils.helpers import clear_stdin, dump_json_bytes, load_json, extract_domain, format_timestamp, generate_filename, create_progress_bar
 from .utils.error_handbook import parse_error, parse_exception
 
 
@@ -29,10 +31,13 @@ class ModelTestSystem:
     # 默认全局测试配置
     DEFAULT_GLOBAL_TEST_CONFIG = {
         'max_workers': 50,              # 最大并发线程数
+        'max_concurrent_per_host': 20,  # 同一主机上同时进行的最大请求数（同时也是连接池大小）
         'request_timeout': 30,          # 单次API请求超时时间（秒）
         'max_retries': 3,               # 单个模型测试的最大重试次数
         'global_timeout': 300,          # 测试总运行时间上限（秒）
         'status_refresh': 0.2,          # 状态监控界面刷新频率（秒）
+        'prewarm': True,                # 测试开始前是否预先建立连接池中的连接
+        'store_response_body': False,   # 测试报告中是否保存完整响应体（否则只保存开头部分）
         'test_prompt': {                # 标准化的测试负载JSON结构
             'messages': [
                 {'role': 'user', 'content': 'Respond with \'OK\''}
@@ -43,17 +48,87 @@ class ModelTestSystem:
         }
     }
     
-    def __init__(self, provider_config: Dict[str, Any], global_test_config: Optional[Dict[str, Any]] = None):
+    # 测试报告CSV列
+    REPORT_FIELDNAMES = [
+        'timestamp',
+        'provider_name',
+        'category',
+        'model_id',
+        'status',
+        'error_code',
+        'error_category',
+        'solution',
+        'latency_ms',
+        'retries',
+        'response_content'
+    ]
+    
+    # 未保存完整响应体时，测试报告中保留的响应体开头字节数
+    RESPONSE_PREVIEW_BYTES = 200
+    
+    # 测试过程中在内存中保留的结果字段（用于显示摘要）
+    SUMMARY_FIELDS = ('provider_name', 'model_id', 'status', 'latency', 'retries')
+    
+    # 各API类型的模型列表端点，未列出的类型使用OpenAI兼容端点
+    MODELS_ENDPOINTS = {
+        # Azure OpenAI API可能有不同的端点格式
+        'azure-openai': '/openai/deployments?api-version=2023-05-15',
+    }
+    
+    # 各API类型的测试请求端点，未列出的类型使用OpenAI兼容端点
+    TEST_ENDPOINT_BUILDERS = {
+        'anthropic': lambda model_id: '/v1/messages',
+        # Google Vertex AI可能有不同的端点格式
+        'google-vertex-ai': lambda model_id: f'/v1/models/{model_id}:predict',
+    }
+    
+    def __init__(self, provider_config: Optional[Dict[str, Any]] = None, global_test_config: Optional[Dict[str, Any]] = None):
         """
         初始化模型测试系统
         
         Args:
-            provider_config (Dict[str, Any]): 用户从ProviderConfigManager选择的单个服务商的配置字典
+            provider_config (Optional[Dict[str, Any]], optional): 用户从ProviderConfigManager选择的单个服务商的配置字典，
+                可稍后通过set_provider()设置
             global_test_config (Optional[Dict[str, Any]], optional): 全局测试配置字典
         """
-        self.provider_config = provider_config
         self.config = global_test_config or self.DEFAULT_GLOBAL_TEST_CONFIG
         
+        # keep-alive连接池，获取模型列表和各测试线程的请求共用；切换到同一主机的服务商时继续复用
+        self._pool = []
+        self._pool_lock = threading.Lock()
+        self._netloc = None
+        
+        # 限制同时发往主机的请求数；max_workers可以大于该值，使处于退避等待的线程不会占满并发名额
+        self._max_per_host = self.config.get('max_concurrent_per_host', 20)
+        self._host_sem = threading.BoundedSemaphore(self._max_per_host)
+        
+        # 并发控制变量
+        # 当前活动任务状态：每个测试线程只修改自己的状态字典，字典条目的添加和删除在GIL下是原子操作，
+        # 读取方（状态行）只需要近似的快照，因此无需加锁
+        self.active_tasks = {}
+        self.should_stop = False  # 全局停止标志
+        self._deadline = float('inf')  # 全局超时的截止时刻（time.monotonic()时钟）
+        self._cancel_event = threading.Event()  # 停止测试时设置，唤醒正在退避等待的测试线程
+        
+        # 进度统计，已完成任务数只由收集结果的主线程更新，测试线程无需加锁
+        self.total_tasks = 0
+        self.completed_tasks = 0
+        
+        if provider_config is not None:
+            self.set_provider(provider_config)
+    
+    def set_provider(self, provider_config: Dict[str, Any]) -> None:
+        """
+        设置（或切换）当前测试的服务商
+        
+        更新服务商相关的URL、密钥和请求头，并清空已加载的模型数据；
+        若新服务商与之前的服务商位于同一主机，则继续复用连接池中的连接
+        
+        Args:
+            provider_config (Dict[str, Any]): 用户从ProviderConfigManager选择的单个服务商的配置字典
+        """
+        self.provider_config = provider_config
+        
         # 提取服务商信息
         self.provider_name = provider_config['name']
         self.api_type = provider_config['api_type']
@@ -68,6 +143,9 @@ class ModelTestSystem:
         # 从base_url提取域名
         self.domain = extract_domain(self.base_url)
         
+        # API类型在服务商切换前不变，在此一次性选定测试端点的构建函数
+        self._build_endpoint = self.TEST_ENDPOINT_BUILDERS.get(self.api_type, lambda model_id: '/v1/chat/completions')
+        
         # 设置HTTP请求头
         self.headers = {
             'Authorization': f'Bearer {self.api_key}',
@@ -79,85 +157,158 @@ class ModelTestSystem:
         # 初始化内部状态变量
         self.models_data = []  # 针对当前选定服务商的模型数据
         self.categories = {}   # 如果能从/models端点获取分类信息
+        self._model_categories = {}  # 模型ID到分类的反向索引，用于生成测试报告
         
-        # 并发控制变量
-        self.status_lock = threading.Lock()
-        self.progress_lock = threading.Lock()
-        self.active_tasks = {}  # 当前活动任务状态
-        self.should_stop = False  # 全局停止标志
+        # 主机变化时关闭连接池中的旧连接
+        if self.domain != self._netloc:
+            self.close()
+            self._netloc = self.domain
+    
+    def close(self) -> None:
+        """
+        关闭连接池中的所有连接
+        """
+        with self._pool_lock:
+            connections, self._pool = self._pool, []
+        for conn in connections:
+            conn.close()
+    
+    def _acquire_connection(self) -> Tuple[http.client.HTTPSConnection, bool]:
+        """
+        从连接池取出一个空闲连接，没有空闲连接时新建一个
         
-        # 进度统计
-        self.total_tasks = 0
-        self.completed_tasks = 0
+        Returns:
+            Tuple[http.client.HTTPSConnection, bool]: (连接, 是否为复用的连接)
+        """
+        with self._pool_lock:
+            if self._pool:
+                return self._pool.pop(), True
+        return http.client.HTTPSConnection(self._netloc, timeout=self.config['request_timeout']), False
     
-    def load_models_for_provider(self) -> bool:
+    def _release_connection(self, conn: http.client.HTTPSConnection) -> None:
+        """
+        将连接放回连接池，连接池已满（达到单主机最大并发请求数）时关闭连接
+        
+        Args:
+            conn (http.client.HTTPSConnection): 已读取完响应的连接
+        """
+        with self._pool_lock:
+            if len(self._pool) < self._max_per_host:
+                self._pool.append(conn)
+                return
+        conn.close()
+    
+    def _prewarm_connection(self) -> None:
+        """
+        预先建立一个连接（完成TCP及TLS握手）并放入连接池
+        
+        建立失败时忽略，错误会在实际测试请求中报告
+        """
+        conn = http.client.HTTPSConnection(self._netloc, timeout=self.config['request_timeout'])
+        try:
+            conn.connect()
+        except Exception:
+            conn.close()
+            return
+        self._release_connection(conn)
+    
+    def _request(self, method: str, endpoint: str, body: Optional[bytes] = None, timeout: Optional[float] = None) -> Tuple[int, bytes]:
+        """
+        通过连接池发送HTTP请求
+        
+        复用的连接可能已被服务端关闭，此时关闭该连接并换一个连接重试
+        
+        Args:
+            method (str): HTTP方法
+            endpoint (str): API端点
+            body (Optional[bytes], optional): 请求体
+            timeout (Optional[float], optional): 本次请求的套接字超时时间（秒），默认为request_timeout
+            
+        Returns:
+            Tuple[int, bytes]: (HTTP状态码, 未解码的响应体)
+        """
+        if timeout is None:
+            timeout = self.config['request_timeout']
+        
+        conn, reused = self._acquire_connection()
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request(method, endpoint, body=body, headers=self.headers)
+            response = conn.getresponse()
+            response_data = response.read()
+        except (http.client.HTTPException, ConnectionError):
+            conn.close()
+            if not reused:
+                raise
+            return self._request(method, endpoint, body, timeout)
+        except Exception:
+            conn.close()
+            raise
+        
+        # 服务端要求关闭的连接不再放回连接池
+        if response.will_close:
+            conn.close()
+        else:
+            self._release_connection(conn)
+        return response.status, response_data
+    
+    def load_models_for_provider(self, log: Callable[[str], None] = print) -> bool:
         """
         加载当前选定服务商的模型列表
         
         尝试从服务商的API端点获取模型列表，如果失败则使用配置中的supported_models
         
+        Args:
+            log (Callable[[str], None], optional): 输出提示信息的函数，默认为print
+            
         Returns:
             bool: 加载成功返回True，否则返回False
         """
         # 首先检查provider_config中的supported_models
         if 'supported_models' in self.provider_config and self.provider_config['supported_models']:
             self.models_data = [{'id': model_id} for model_id in self.provider_config['supported_models']]
-            print(f"已从配置加载 {len(self.models_data)} 个模型")
+            log(f"已从配置加载 {len(self.models_data)} 个模型")
             return True
         
         # 如果supported_models为空，尝试从API获取
         if not self.base_url:
-            print("错误: 未提供base_url，无法从API获取模型列表")
+            log("错误: 未提供base_url，无法从API获取模型列表")
             return False
         
         try:
-            # 确定模型列表API端点
-            endpoint = '/v1/models'
-            if self.api_type == 'azure-openai':
-                # Azure OpenAI API可能有不同的端点格式
-                endpoint = '/openai/deployments?api-version=2023-05-15'
-            
-            # 解析URL
-            parsed_url = urlparse(self.base_url)
-            conn = http.client.HTTPSConnection(parsed_url.netloc, timeout=self.config['request_timeout'])
-            
-            # 发送请求
-            conn.request('GET', endpoint, headers=self.headers)
-            response = conn.getresponse()
-            response_data = response.read().decode('utf-8')
+            # 确定模型列表API端点并发送请求
+            endpoint = self.MODELS_ENDPOINTS.get(self.api_type, '/v1/models')
+            status, response_data = self._request('GET', endpoint)
             
-            if response.status == 200:
-                data = json.loads(response_data)
+            if status == 200:
+                data = load_json(response_data)
                 
-                # 解析响应数据，格式可能因API类型而异
-                if self.api_type == 'azure-openai':
-                    # Azure OpenAI API格式
-                    self.models_data = data.get('data', [])
-                else:
-                    # 标准OpenAI API格式
-                    self.models_data = data.get('data', [])
-                    
-                    # 如果API返回信息包含owned_by，可据此进行分类
+                # Azure OpenAI与标准OpenAI API的列表都位于data字段，忽略没有ID的条目
+                self.models_data = [model for model in data.get('data', []) if 'id' in model]
+                
+                # 标准OpenAI API返回信息包含owned_by时，可据此进行分类
+                if self.api_type != 'azure-openai':
                     for model in self.models_data:
                         if 'owned_by' in model:
                             category = model['owned_by']
-                            if category not in self.categories:
-                                self.categories[category] = []
-                            self.categories[category].append(model['id'])
+                            self.categories.setdefault(category, []).append(model['id'])
+                            self._model_categories.setdefault(model['id'], category)
                 
                 # 按名称排序模型
-                self.models_data.sort(key=lambda x: x.get('id', ''))
+                self.models_data.sort(key=itemgetter('id'))
                 
-                print(f"已从API加载 {len(self.models_data)} 个模型")
+                log(f"已从API加载 {len(self.models_data)} 个模型")
                 return True
             else:
-                error_info = parse_error(response.status, response_data)
-                print(f"从API获取模型列表失败: {error_info['error_category']} - {error_info['solution']}")
+                error_info = parse_error(status, response_data)
+                log(f"从API获取模型列表失败: {error_info.error_category} - {error_info.solution}")
                 return False
         
         except Exception as e:
             error_info = parse_exception(e)
-            print(f"从API获取模型列表时发生错误: {error_info['error_category']} - {error_info['solution']}")
+            log(f"从API获取模型列表时发生错误: {error_info.error_category} - {error_info.solution}")
             return False
     
     def _select_models_for_testing(self) -> List[str]:
@@ -210,6 +361,8 @@ class ModelTestSystem:
         
         # 显示选择菜单
         print(f"\n服务商 '{self.provider_name}' 的可用模型:")
+        # 丢弃加载模型列表期间提前键入的按键
+        clear_stdin()
         selection = questionary.select(
             "请选择要测试的模型:",
             choices=model_choices
@@ -239,63 +392,112 @@ class ModelTestSystem:
         self.completed_tasks = 0
         self.active_tasks = {}
         self.should_stop = False
+        self._cancel_event.clear()
         
-        # 创建结果列表
+        # 创建结果列表，只保留显示摘要所需的字段；完整结果逐行写入测试报告
         results = []
+        report_file, report_writer = self._open_report()
+        
+        # 全局超时截止时刻，由各测试线程和收集结果的主线程检查
+        self._deadline = time.monotonic() + self.config['global_timeout']
+        
+        print(f"服务商: {self.provider_name}")
         
-        # 启动全局超时计时器
-        global_timeout_timer = threading.Timer(self.config['global_timeout'], self._handle_global_timeout)
-        global_timeout_timer.daemon = True
-        global_timeout_timer.start()
+        future_to_model = {}
+        collected = set()
         
-        # 启动状态监控线程
-        monitor_thread = threading.Thread(target=self._status_monitor)
-        monitor_thread.daemon = True
-        monitor_thread.start()
+        def collect(future):
+            """将一个已完成的测试任务的结果写入测试报告并加入摘要"""
+            nonlocal report_writer
+            collected.add(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                model_id = future_to_model[future]
+                error_info = parse_exception(e)
+                result = {
+                    'model_id': model_id,
+                    'provider_name': self.provider_name,
+                    'timestamp': format_timestamp(),
+                    'status': 'error',
+                    'latency': 0,
+                    'retries': 0,
+                    'error_code': error_info.error_code,
+                    'error_category': error_info.error_category,
+                    'solution': error_info.solution,
+                    'response': str(e)
+                }
+            
+            if report_writer is not None:
+                try:
+                    report_writer.writerow(self._report_row(result))
+                except OSError as e:
+                    print(f"\n写入测试报告时发生错误: {e}")
+                    report_writer = None
+            results.append({key: result[key] for key in self.SUMMARY_FIELDS})
         
         try:
             # 使用ThreadPoolExecutor并发执行测试
-            with ThreadPoolExecutor(max_workers=min(self.config['max_workers'], len(models_to_test))) as executor:
-                # 提交所有测试任务
-                future_to_model = {executor.submit(self._test_model_once, model_id): model_id for model_id in models_to_test}
+            worker_count = min(self.config['max_workers'], len(models_to_test))
+            with ThreadPoolExecutor(max_workers=worker_count) as executor:
+                try:
+                    # 并发预热连接池，使第一批测试请求不必各自等待握手
+                    if self.config.get('prewarm', True):
+                        with self._pool_lock:
+                            missing = min(worker_count, self._max_per_host) - len(self._pool)
+                        wait([executor.submit(self._prewarm_connection) for _ in range(missing)])
+                    
+                    # 提交所有测试任务
+                    future_to_model = {executor.submit(self._test_model_once, model_id): model_id for model_id in models_to_test}
+                    
+                    # 按完成顺序收集结果，每个刷新周期在同一行内更新一次状态并检查全局超时
+                    pending = set(future_to_model)
+                    while pending:
+                        done, pending = wait(pending, timeout=self.config['status_refresh'], return_when=FIRST_COMPLETED)
+                        
+                        for future in done:
+                            collect(future)
+                        
+                        self.completed_tasks = len(results)
+                        
+                        if not self.should_stop and time.monotonic() >= self._deadline:
+                            self._handle_global_timeout()
+                        
+                        self._draw_status()
                 
-                # 收集结果
-                for future in future_to_model:
-                    try:
-                        result = future.result()
-                        results.append(result)
-                    except Exception as e:
-                        model_id = future_to_model[future]
-                        error_info = parse_exception(e)
-                        results.append({
-                            'model_id': model_id,
-                            'provider_name': self.provider_name,
-                            'timestamp': format_timestamp(),
-                            'status': 'error',
-                            'latency': 0,
-                            'retries': 0,
-                            'error_code': error_info['error_code'],
-                            'error_category': error_info['error_category'],
-                            'solution': error_info['solution'],
-                            'response': str(e)
-                        })
+                except BaseException:
+                    # 被中断（如Ctrl+C）时，在执行器等待线程结束之前设置停止标志并取消尚未开始的测试，
+                    # 使正在退避等待的测试线程立即结束
+                    self.should_stop = True
+                    self._cancel_event.set()
+                    for future in future_to_model:
+                        future.cancel()
+                    raise
         
         finally:
-            # 停止全局超时计时器
-            global_timeout_timer.cancel()
-            
-            # 设置停止标志，等待监控线程结束
+            # 设置停止标志，唤醒仍在退避等待的测试线程
             self.should_stop = True
-            monitor_thread.join(timeout=1.0)
+            self._cancel_event.set()
             
-            # 清空控制台并显示结果
-            clear_console()
+            # 收集中断时已经结束但尚未收集的测试结果
+            for future in future_to_model:
+                if future.done() and not future.cancelled() and future not in collected:
+                    collect(future)
+            
+            # 结束状态行并显示结果
+            sys.stdout.write("\n")
             self._show_results(results)
             
-            # 生成报告
-            report_file = self.generate_report(results)
-            if report_file:
-                print(f"\n测试报告已保存到: {report_file}")
+            # 关闭测试报告，没有任何结果时删除只有表头的报告文件
+            if report_file is not None:
+                report_file.close()
+                if not results:
+                    try:
+                        os.remove(report_file.name)
+                    except OSError:
+                        pass
+                elif report_writer is not None:
+                    print(f"\n测试报告已保存到: {report_file.name}")
     
     def _test_model_once(self, model_id: str) -> Dict[str, Any]:
         """
@@ -321,39 +523,37 @@ class ModelTestSystem:
             'response': ''
         }
         
-        # 检查全局停止标志
-        if self.should_stop:
+        # 检查全局超时
+        if self.should_stop or time.monotonic() >= self._deadline:
             result['status'] = 'global_timeout'
             return result
         
         # 构建请求负载
         payload = self.config['test_prompt'].copy()
         payload['model'] = model_id
+        # 请求体在各次重试之间不变，只序列化一次
+        body = dump_json_bytes(payload)
         
         # 确定API端点
-        endpoint = '/v1/chat/completions'
-        if self.api_type == 'anthropic':
-            endpoint = '/v1/messages'
-        elif self.api_type == 'google-vertex-ai':
-            # Google Vertex AI可能有不同的端点格式
-            endpoint = '/v1/models/{model}:predict'.format(model=model_id)
+        endpoint = self._build_endpoint(model_id)
         
         # 更新活动任务状态
-        with self.status_lock:
-            self.active_tasks[model_id] = {
-                'status': 'starting',
-                'start_time': time.time(),
-                'retries': 0,
-                'latency': 0
-            }
+        task_state = {
+            'status': 'starting',
+            'start_time': time.time(),
+            'retries': 0,
+            'latency': 0
+        }
+        self.active_tasks[model_id] = task_state
         
         # 重试逻辑
         retry_count = 0
         max_retries = self.config['max_retries']
         
         while retry_count <= max_retries:
-            # 检查全局停止标志
-            if self.should_stop:
+            # 检查全局超时，请求的超时时间不超过剩余时间，使进行中的请求在截止时刻返回
+            remaining = self._deadline - time.monotonic()
+            if self.should_stop or remaining <= 0:
                 result['status'] = 'global_timeout'
                 break
             
@@ -361,20 +561,26 @@ class ModelTestSystem:
             result['retries'] = retry_count
             
             # 更新活动任务状态
-            with self.status_lock:
-                self.active_tasks[model_id]['status'] = 'running' if retry_count == 0 else f'retry_{retry_count}'
-                self.active_tasks[model_id]['retries'] = retry_count
+            task_state['status'] = 'running' if retry_count == 0 else f'retry_{retry_count}'
+            task_state['retries'] = retry_count
+            
+            # 等待单主机并发名额，最多等到全局超时截止时刻
+            if not self._host_sem.acquire(timeout=remaining):
+                result['status'] = 'global_timeout'
+                break
+            remaining = self._deadline - time.monotonic()
+            if remaining <= 0:
+                self._host_sem.release()
+                result['status'] = 'global_timeout'
+                break
             
             try:
-                # 解析URL
-                parsed_url = urlparse(self.base_url)
-                conn = http.client.HTTPSConnection(parsed_url.netloc, timeout=self.config['request_timeout'])
-                
-                # 发送请求
+                # 通过连接池发送请求
                 start_time = time.time()
-                conn.request('POST', endpoint, body=json.dumps(payload), headers=self.headers)
-                response = conn.getresponse()
-                response_data = response.read().decode('utf-8')
+                try:
+                    status, response_data = self._request('POST', endpoint, body, min(self.config['request_timeout'], remaining))
+                finally:
+                    self._host_sem.release()
                 end_time = time.time()
                 
                 # 计算延迟（毫秒）
@@ -382,99 +588,87 @@ class ModelTestSystem:
                 result['latency'] = latency
                 
                 # 更新活动任务状态
-                with self.status_lock:
-                    self.active_tasks[model_id]['latency'] = latency
+                task_state['latency'] = latency
                 
                 # 处理响应
-                if response.status == 200:
+                if status == 200:
                     # 成功
                     result['status'] = 'success'
-                    result['response'] = response_data
+                    result['response'] = self._response_text(response_data)
                     break
                 else:
                     # HTTP错误
-                    error_info = parse_error(response.status, response_data)
-                    result['status'] = f"{response.status}/{error_info['error_code']}"
-                    result['error_code'] = error_info['error_code']
-                    result['error_category'] = error_info['error_category']
-                    result['solution'] = error_info['solution']
-                    result['response'] = response_data
+                    error_info = parse_error(status, response_data)
+                    result['status'] = f"{status}/{error_info.error_code}"
+                    result['error_code'] = error_info.error_code
+                    result['error_category'] = error_info.error_category
+                    result['solution'] = error_info.solution
+                    result['response'] = self._response_text(response_data)
                     
                     # 某些错误不应重试
-                    if response.status in [400, 401, 403, 404]:
+                    if status in [400, 401, 403, 404]:
                         break
             
             except Exception as e:
                 # Python异常
                 error_info = parse_exception(e)
-                result['status'] = f"exception/{error_info['error_code']}"
-                result['error_code'] = error_info['error_code']
-                result['error_category'] = error_info['error_category']
-                result['solution'] = error_info['solution']
+                result['status'] = f"exception/{error_info.error_code}"
+                result['error_code'] = error_info.error_code
+                result['error_category'] = error_info.error_category
+                result['solution'] = error_info.solution
                 result['response'] = str(e)
             
             # 增加重试计数
             retry_count += 1
             
-            # 如果还有重试次数，等待一段时间后重试（简单的指数退避）
+            # 如果还有重试次数，等待一段时间后重试（带随机抖动的指数退避，避免并发线程同时重试）；
+            # 停止测试时等待立即结束，随后在循环开头标记为全局超时
             if retry_count <= max_retries:
-                backoff_time = min(2 ** retry_count, 10)  # 最多等待10秒
-                time.sleep(backoff_time)
+                backoff_time = min(2 ** retry_count, 10) * (0.5 + random.random())  # 基准最多10秒
+                self._cancel_event.wait(backoff_time)
         
         # 测试结束，从活动任务中移除
-        with self.status_lock:
-            if model_id in self.active_tasks:
-                del self.active_tasks[model_id]
-        
-        # 原子地增加已完成任务计数
-        with self.progress_lock:
-            self.completed_tasks += 1
+        self.active_tasks.pop(model_id, None)
         
         return result
     
-    def _status_monitor(self) -> None:
+    def _response_text(self, response_data: bytes) -> str:
         """
-        实时状态监控
+        获取写入测试结果的响应体文本
         
-        在独立线程中运行，定期刷新控制台显示当前测试状态
-        """
-        while not self.should_stop:
-            # 清空控制台
-            clear_console()
-            
-            # 获取当前状态的快照
-            with self.status_lock:
-                active_tasks_snapshot = self.active_tasks.copy()
-            
-            with self.progress_lock:
-                completed = self.completed_tasks
-                total = self.total_tasks
-            
-            # 显示当前并发数和进度
-            print(f"服务商: {self.provider_name}")
-            print(f"当前并发数: {len(active_tasks_snapshot)}/{self.config['max_workers']}")
-            print(create_progress_bar(completed, total))
-            
-            # 显示当前测试中的模型
-            if active_tasks_snapshot:
-                print("\n当前测试中的模型:")
-                for model_id, task_info in active_tasks_snapshot.items():
-                    status_icon = "🔄" if task_info['status'] == 'running' else "⏹️"
-                    latency = task_info['latency']
-                    retries = task_info['retries']
-                    print(f"{status_icon} {model_id} ({self.provider_name}) - {latency}ms - 重试: {retries}")
+        未开启store_response_body时只解码响应体的开头部分
+        
+        Args:
+            response_data (bytes): 未解码的响应体
             
-            # 休眠一段时间
-            time.sleep(self.config['status_refresh'])
+        Returns:
+            str: 响应体文本
+        """
+        if self.config.get('store_response_body', False):
+            return response_data.decode('utf-8', 'replace')
+        return response_data[:self.RESPONSE_PREVIEW_BYTES].decode('utf-8', 'ignore')
+    
+    def _draw_status(self) -> None:
+        """
+        刷新测试状态行
+        
+        使用ANSI控制码清除当前行后重新输出，状态始终显示在同一行内
+        """
+        sys.stdout.write(
+            f"\x1b[2K\r{create_progress_bar(self.completed_tasks, self.total_tasks)} "
+            f"当前并发数: {len(self.active_tasks)}/{self.config['max_workers']}"
+        )
+        sys.stdout.flush()
     
     def _handle_global_timeout(self) -> None:
         """
         处理全局超时
         
-        由全局超时计时器调用，设置停止标志
+        由收集结果的主线程在到达截止时刻时调用，设置停止标志
         """
         print(f"\n警告: 已达到全局超时限制 ({self.config['global_timeout']}秒)，正在停止测试...")
         self.should_stop = True
+        self._cancel_event.set()
     
     def _show_results(self, results: List[Dict[str, Any]]) -> None:
         """
@@ -502,6 +696,62 @@ class ModelTestSystem:
         print("-" * 80)
         print(f"总计: {len(results)} 个模型测试完成，成功: {success_count}，失败: {failure_count}")
     
+    def _report_path(self) -> str:
+        """
+        生成新测试报告的文件路径，并确保data目录存在
+        
+        Returns:
+            str: 报告文件路径
+        """
+        report_filename = generate_filename("model_test_report", "csv", time.time())
+        
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        data_dir = os.path.join(base_dir, 'data')
+        os.makedirs(data_dir, exist_ok=True)
+        
+        return os.path.join(data_dir, report_filename)
+    
+    def _report_row(self, result: Dict[str, Any]) -> Tuple[Any, ...]:
+        """
+        将测试结果转换为测试报告中的一行
+        
+        Args:
+            result (Dict[str, Any]): 测试结果
+            
+        Returns:
+            Tuple[Any, ...]: 按REPORT_FIELDNAMES顺序排列的行数据
+        """
+        return (
+            result['timestamp'],
+            result['provider_name'],
+            self._model_categories.get(result['model_id'], ''),
+            result['model_id'],
+            result['status'],
+            result.get('error_code', ''),
+            result.get('error_category', ''),
+            result.get('solution', ''),
+            result['latency'],
+            result['retries'],
+            result['response']
+        )
+    
+    def _open_report(self) -> Tuple[Optional[IO[str]], Any]:
+        """
+        创建测试报告文件并写入表头，供测试过程中逐行写入结果
+        
+        Returns:
+            Tuple[Optional[IO[str]], Any]: (报告文件, csv.writer写入器)，创建失败时均为None
+        """
+        try:
+            csvfile = open(self._report_path(), 'w', newline='', encoding='utf-8-sig')
+        except Exception as e:
+            print(f"生成报告时发生错误: {e}")
+            return None, None
+        
+        writer = csv.writer(csvfile)
+        writer.writerow(self.REPORT_FIELDNAMES)
+        return csvfile, writer
+    
     def generate_report(self, results: List[Dict[str, Any]]) -> str:
         """
         生成测试报告
@@ -513,60 +763,13 @@ class ModelTestSystem:
             str: 报告文件路径
         """
         try:
-            # 生成报告文件名
-            timestamp = time.time()
-            report_filename = generate_filename("model_test_report", "csv", timestamp)
-            
-            # 确保data目录存在
-            import os
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            data_dir = os.path.join(base_dir, 'data')
-            os.makedirs(data_dir, exist_ok=True)
-            
-            report_path = os.path.join(data_dir, report_filename)
-            
-            # 定义CSV列
-            fieldnames = [
-                'timestamp',
-                'provider_name',
-                'category',
-                'model_id',
-                'status',
-                'error_code',
-                'error_category',
-                'solution',
-                'latency_ms',
-                'retries',
-                'response_content'
-            ]
+            report_path = self._report_path()
             
             # 写入CSV文件
             with open(report_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for result in results:
-                    # 查找模型分类（如果有）
-                    category = ''
-                    for cat, models in self.categories.items():
-                        if result['model_id'] in models:
-                            category = cat
-                            break
-                    
-                    # 写入行
-                    writer.writerow({
-                        'timestamp': result['timestamp'],
-                        'provider_name': result['provider_name'],
-                        'category': category,
-                        'model_id': result['model_id'],
-                        'status': result['status'],
-                        'error_code': result.get('error_code', ''),
-                        'error_category': result.get('error_category', ''),
-                        'solution': result.get('solution', ''),
-                        'latency_ms': result['latency'],
-                        'retries': result['retries'],
-                        'response_content': result['response']
-                    })
+                writer = csv.writer(csvfile)
+                writer.writerow(self.REPORT_FIELDNAMES)
+                writer.writerows([self._report_row(result) for result in results])
             
             return report_path
         
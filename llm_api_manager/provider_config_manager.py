@@ -5,10 +5,41 @@
 负责存储、管理和检索各个LLM服务商的配置信息。
 """
 
+import copy
 import os
-import json
-from typing import Dict, List, Optional, Any, Union
-from .utils.helpers import load_from_json, save_to_json
+import hashlib
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from itertools import islice
+from typing import Dict, List, Optional, Any, Union, Tuple
+from .utils.helpers import dump_json_bytes, load_from_json, write_file_atomic
+
+
+def _synchronized(method):
+    """
+    在配置管理器的锁内执行被装饰的方法，保证来自不同线程的配置修改互斥，
+    并使分页读取得到与总数一致的快照
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class BulkUpdateResult:
+    """
+    批量更新的结果，由bulk_update()产生，退出上下文后可查看
+    
+    Attributes:
+        saved (bool): 退出上下文时的统一保存是否成功（无需保存时为True）
+    """
+    
+    __slots__ = ('saved',)
+    
+    def __init__(self):
+        self.saved = True
 
 
 class ProviderConfigManager:
@@ -48,15 +79,114 @@ class ProviderConfigManager:
         
         # 加载配置文件，如果文件不存在则创建空列表
         self.providers = load_from_json(self.config_file_path, default=[])
+        
+        # 配置文件当前内容的摘要，保存的内容与之相同时跳过写入
+        self._saved_digest = None
+        try:
+            with open(self.config_file_path, 'rb') as f:
+                self._saved_digest = self._digest(f.read())
+        except OSError:
+            pass
+        
+        # 按名称索引的服务商配置，以及名称列表和导出结果缓存，仅在配置变更时失效
+        self._providers_dict = {provider['name']: provider for provider in self.providers}
+        self._names_cache = None
+        self._api_keys_and_urls_cache = None
+        
+        # 模型名称（原始名称及映射名称）到匹配服务商的倒排索引，首次查询时构建
+        self._model_index = None
+        
+        # 批量更新状态：延迟保存时只标记为已修改，退出批量更新时统一写入
+        self._defer_save = False
+        self._dirty = False
+        
+        # 配置修改锁（可重入），后台线程与主线程的修改通过它互斥
+        self._lock = threading.RLock()
     
+    @staticmethod
+    def _digest(data: bytes) -> bytes:
+        """
+        计算配置文件内容的摘要
+        
+        Args:
+            data (bytes): 配置文件内容
+            
+        Returns:
+            bytes: 16字节摘要
+        """
+        return hashlib.blake2b(data, digest_size=16).digest()
+    
+    @_synchronized
     def save_config(self) -> bool:
         """
         保存配置到文件
         
+        配置内容与文件中已有内容相同时不重复写入；写入通过临时文件替换完成，中断时不会损坏原文件
+        
         Returns:
             bool: 保存成功返回True，否则返回False
         """
-        return save_to_json(self.providers, self.config_file_path)
+        data = dump_json_bytes(self.providers, indent=True)
+        digest = self._digest(data)
+        if digest == self._saved_digest:
+            self._dirty = False
+            return True
+        
+        try:
+            write_file_atomic(self.config_file_path, data)
+        except OSError as e:
+            # 写入失败时保留已修改标记，配置仍需保存
+            print(f"保存配置文件失败: {e}")
+            return False
+        
+        self._saved_digest = digest
+        self._dirty = False
+        return True
+    
+    def _commit(self) -> bool:
+        """
+        提交一次配置修改
+        
+        处于批量更新中时只标记配置为已修改，否则立即保存到文件
+        
+        Returns:
+            bool: 成功返回True，否则返回False
+        """
+        if self._defer_save:
+            self._dirty = True
+            return True
+        return self.save_config()
+    
+    @contextmanager
+    def bulk_update(self):
+        """
+        批量更新上下文管理器
+        
+        上下文内的添加、更新和删除操作不会立即写入文件（其返回值只表示修改是否被接受），
+        退出上下文时如有修改则统一保存一次，保存是否成功记录在产生的结果对象中。
+        上下文期间持有配置修改锁，其他线程的修改会等待其结束。
+        
+        Yields:
+            BulkUpdateResult: 批量更新的结果，退出上下文后其saved属性表示保存是否成功
+        """
+        result = BulkUpdateResult()
+        with self._lock:
+            previous = self._defer_save
+            self._defer_save = True
+            try:
+                yield result
+            finally:
+                self._defer_save = previous
+                if not self._defer_save and self._dirty:
+                    result.saved = self.save_config()
+    
+    def _invalidate_caches(self) -> None:
+        """
+        使由服务商配置派生的缓存失效，配置变更后调用
+        """
+        self._names_cache = None
+        self._api_keys_and_urls_cache = None
+        self._model_index = None
     
     def get_all_provider_names(self) -> List[str]:
         """
@@ -65,7 +195,15 @@ class ProviderConfigManager:
         Returns:
             List[str]: 服务商名称列表
         """
-        return [provider['name'] for provider in self.providers]
+        # 缓存可能被其他线程随时置为None，先取到局部变量再检查和返回；
+        # 在锁内重建，避免与配置修改交错而缓存过期的结果
+        names = self._names_cache
+        if names is None:
+            with self._lock:
+                names = self._names_cache
+                if names is None:
+                    names = self._names_cache = [provider['name'] for provider in self.providers]
+        return names
     
     def get_provider_config(self, provider_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -77,10 +215,21 @@ class ProviderConfigManager:
         Returns:
             Optional[Dict[str, Any]]: 服务商配置字典，如果不存在则返回None
         """
-        for provider in self.providers:
-            if provider['name'] == provider_name:
-                return provider
-        return None
+        return self._providers_dict.get(provider_name)
+    
+    @_synchronized
+    def get_provider_config_copy(self, provider_name: str) -> Optional[Dict[str, Any]]:
+        """
+        获取指定服务商配置的深拷贝，用于在不持有锁的情况下编辑
+        
+        Args:
+            provider_name (str): 服务商名称
+            
+        Returns:
+            Optional[Dict[str, Any]]: 服务商配置字典的副本，如果不存在则返回None
+        """
+        provider = self._providers_dict.get(provider_name)
+        return copy.deepcopy(provider) if provider is not None else None
     
     def provider_exists(self, provider_name: str) -> bool:
         """
@@ -92,8 +241,49 @@ class ProviderConfigManager:
         Returns:
             bool: 存在返回True，否则返回False
         """
-        return provider_name in self.get_all_provider_names()
+        return provider_name in self._providers_dict
+    
+    @_synchronized
+    def get_provider_models_page(self, provider_name: str, offset: int, limit: int) -> Optional[Tuple[int, List[str]]]:
+        """
+        分页获取服务商支持的模型
+        
+        Args:
+            provider_name (str): 服务商名称
+            offset (int): 起始位置
+            limit (int): 最多返回的条目数
+            
+        Returns:
+            Optional[Tuple[int, List[str]]]: (模型总数, 当前页的模型列表)，如果服务商不存在则返回None
+        """
+        provider = self._providers_dict.get(provider_name)
+        if provider is None:
+            return None
+        
+        models = provider.get('supported_models', [])
+        return len(models), models[offset:offset + limit]
+    
+    @_synchronized
+    def get_provider_mappings_page(self, provider_name: str, offset: int, limit: int) -> Optional[Tuple[int, List[Tuple[str, str]]]]:
+        """
+        分页获取服务商的模型映射
+        
+        Args:
+            provider_name (str): 服务商名称
+            offset (int): 起始位置
+            limit (int): 最多返回的条目数
+            
+        Returns:
+            Optional[Tuple[int, List[Tuple[str, str]]]]: (映射总数, 当前页的(映射名称, 模型ID)列表)，如果服务商不存在则返回None
+        """
+        provider = self._providers_dict.get(provider_name)
+        if provider is None:
+            return None
+        
+        mappings = provider.get('model_mappings', {})
+        return len(mappings), list(islice(mappings.items(), offset, offset + limit))
     
+    @_synchronized
     def add_provider(self, provider_config: Dict[str, Any]) -> bool:
         """
         添加新的服务商配置
@@ -126,8 +316,11 @@ class ProviderConfigManager:
         
         # 添加服务商配置
         self.providers.append(provider_config)
-        return self.save_config()
+        self._providers_dict[provider_config['name']] = provider_config
+        self._invalidate_caches()
+        return self._commit()
     
+    @_synchronized
     def update_provider(self, provider_name: str, updated_config: Dict[str, Any]) -> bool:
         """
         更新服务商配置
@@ -150,21 +343,17 @@ class ProviderConfigManager:
                 print(f"错误: 新名称 '{updated_config['name']}' 已被其他服务商使用")
                 return False
         
-        # 更新配置
-        for i, provider in enumerate(self.providers):
-            if provider['name'] == provider_name:
-                # 保留原始配置中未在更新中指定的字段
-                for key, value in updated_config.items():
-                    self.providers[i][key] = value
-                
-                # 如果更新了名称，更新provider_name以便后续操作
-                if 'name' in updated_config:
-                    provider_name = updated_config['name']
-                
-                return self.save_config()
-        
-        return False
+        # 更新配置，保留原始配置中未在更新中指定的字段
+        provider = self._providers_dict.pop(provider_name)
+        for key, value in updated_config.items():
+            provider[key] = value
+        
+        # 按（可能已更新的）名称重新索引
+        self._providers_dict[provider['name']] = provider
+        self._invalidate_caches()
+        return self._commit()
     
+    @_synchronized
     def delete_provider(self, provider_name: str) -> bool:
         """
         删除服务商配置
@@ -181,14 +370,17 @@ class ProviderConfigManager:
             return False
         
         # 删除配置
-        self.providers = [p for p in self.providers if p['name'] != provider_name]
-        return self.save_config()
+        removed = self._providers_dict.pop(provider_name)
+        self.providers = [p for p in self.providers if p is not removed]
+        self._invalidate_caches()
+        return self._commit()
     
     def find_model_provider(self, model_name: str) -> List[Dict[str, Any]]:
         """
         根据模型名称查找提供该模型的服务商
         
-        搜索所有服务商的原始模型名称和映射名称，返回匹配的服务商及其API详情
+        搜索所有服务商的原始模型名称和映射名称，返回匹配的服务商及其API详情。
+        查找通过反向索引进行，索引在配置变更后重新构建
         
         Args:
             model_name (str): 模型名称（原始名称或映射名称）
@@ -201,31 +393,46 @@ class ProviderConfigManager:
                 - actual_model_name: 实际模型名称（如果是映射名称，则返回映射后的名称）
                 - custom_headers: 自定义请求头
         """
-        results = []
+        model_index = self._model_index
+        if model_index is None:
+            with self._lock:
+                model_index = self._model_index
+                if model_index is None:
+                    model_index = self._model_index = self._build_model_index()
+        
+        return [
+            {
+                'provider_name': provider['name'],
+                'base_url': provider.get('base_url', ''),
+                'api_key': provider['api_keys'][0] if provider['api_keys'] else '',
+                'actual_model_name': actual_model_name,
+                'custom_headers': provider.get('custom_headers', {})
+            }
+            for provider, actual_model_name in model_index.get(model_name, [])
+        ]
+    
+    def _build_model_index(self) -> Dict[str, List[Tuple[Dict[str, Any], str]]]:
+        """
+        构建模型名称到匹配服务商的倒排索引
+        
+        每个服务商的原始模型名称和映射名称都作为索引键，
+        同一键下的条目顺序与逐个服务商查找时一致
+        
+        Returns:
+            Dict[str, List[Tuple[Dict[str, Any], str]]]: 模型名称到(服务商配置, 实际模型名称)列表的字典
+        """
+        index = {}
         
         for provider in self.providers:
-            # 检查原始模型名称
-            if model_name in provider.get('supported_models', []):
-                results.append({
-                    'provider_name': provider['name'],
-                    'base_url': provider.get('base_url', ''),
-                    'api_key': provider['api_keys'][0] if provider['api_keys'] else '',
-                    'actual_model_name': model_name,
-                    'custom_headers': provider.get('custom_headers', {})
-                })
+            # 原始模型名称（同一服务商内重复的名称只记录一次）
+            for model_name in dict.fromkeys(provider.get('supported_models', [])):
+                index.setdefault(model_name, []).append((provider, model_name))
             
-            # 检查映射模型名称
-            model_mappings = provider.get('model_mappings', {})
-            if model_name in model_mappings:
-                results.append({
-                    'provider_name': provider['name'],
-                    'base_url': provider.get('base_url', ''),
-                    'api_key': provider['api_keys'][0] if provider['api_keys'] else '',
-                    'actual_model_name': model_mappings[model_name],
-                    'custom_headers': provider.get('custom_headers', {})
-                })
-        
-        return results
+            # 映射模型名称
+            for mapped_name, actual_name in provider.get('model_mappings', {}).items():
+                index.setdefault(mapped_name, []).append((provider, actual_name))
+        
+        return index
     
     def export_model_mappings(self, provider_name: str) -> Optional[Dict[str, str]]:
         """
@@ -270,13 +477,19 @@ class ProviderConfigManager:
         Returns:
             List[Dict[str, Union[str, List[str]]]]: 包含服务商名称、基础URL和API密钥的字典列表
         """
-        result = []
-        for provider in self.providers:
-            result.append({
-                'name': provider['name'],
-                'base_url': provider.get('base_url', ''),
-                'api_keys': provider.get('api_keys', [])
-            })
+        result = self._api_keys_and_urls_cache
+        if result is None:
+            with self._lock:
+                result = self._api_keys_and_urls_cache
+                if result is None:
+                    result = []
+                    for provider in self.providers:
+                        result.append({
+                            'name': provider['name'],
+                            'base_url': provider.get('base_url', ''),
+                            'api_keys': provider.get('api_keys', [])
+                        })
+                    self._api_keys_and_urls_cache = result
         return result
     
     def export_all_configs(self) -> List[Dict[str, Any]]:
@@ -5,6 +5,16 @@
 定义了LLM API测试过程中可能遇到的各种错误类型、分类和解决方案。
 """
 
+import socket
+import ssl
+import sys
+from collections import namedtuple
+from functools import lru_cache
+from http.client import HTTPException
+from types import MappingProxyType
+
+from .helpers import load_json
+
 # 错误手册：映射HTTP状态码/API特定错误码到错误分类和解决方案
 ERROR_HANDBOOK = {
     # HTTP状态码错误
@@ -84,6 +94,101 @@ ERROR_HANDBOOK = {
     }
 }
 
+# 错误手册为只读映射，防止调用方意外修改共享的条目；分类和解决方案字符串经过驻留，
+# 调用方与其比较时相同对象可直接按指针判等
+ERROR_HANDBOOK = MappingProxyType({
+    code: MappingProxyType({key: sys.intern(value) for key, value in info.items()})
+    for code, info in ERROR_HANDBOOK.items()
+})
+
+# 以整数HTTP状态码为键的错误手册条目，parse_error中直接按状态码查找
+ERROR_HANDBOOK_BY_STATUS = {int(k): v for k, v in ERROR_HANDBOOK.items() if k.isdigit()}
+_UNKNOWN = ERROR_HANDBOOK["unknown"]
+
+
+class ParsedError(namedtuple('ParsedError', ['error_code', 'error_category', 'solution'])):
+    """
+    错误解析结果
+    
+    不可变且没有实例字典，可通过属性访问各字段；需要字典时调用_asdict()
+    
+    Attributes:
+        error_code: 错误码
+        error_category (str): 错误分类
+        solution (str): 解决方案
+    """
+    __slots__ = ()
+
+
+def _build_result(error_code, error_info):
+    """
+    构建错误解析结果
+    
+    Args:
+        error_code: 错误码
+        error_info (Mapping): 错误手册条目
+        
+    Returns:
+        ParsedError: 错误解析结果
+    """
+    return ParsedError(error_code, error_info["category"], error_info["solution"])
+
+
+# 预先构建的parse_error结果（不可变，可在多次调用之间共享）：
+# 响应体中没有可识别错误码时按HTTP状态码返回，识别出错误手册中的错误码时按错误码返回
+_STATUS_RESULTS = {code: _build_result("unknown", info) for code, info in ERROR_HANDBOOK_BY_STATUS.items()}
+_UNKNOWN_RESULT = _build_result("unknown", _UNKNOWN)
+_ERROR_CODE_RESULTS = {code: _build_result(code, info) for code, info in ERROR_HANDBOOK.items()}
+
+# 异常类型到错误手册键的映射，parse_exception沿异常类的MRO查找，子类优先于基类
+# （例如ssl.SSLError和socket.timeout都是OSError的子类）；HTTPException单独处理
+_HTTP_CLIENT_ERROR = "http_client_error"
+_EXCEPTION_TYPE_KEYS = {
+    socket.timeout: "timeout",
+    TimeoutError: "timeout",
+    ssl.SSLError: "ssl_error",
+    ConnectionError: "connection_error",
+    socket.error: "connection_error",
+    HTTPException: _HTTP_CLIENT_ERROR,
+}
+
+# 响应体中的API错误码可能改变错误分类的HTTP状态码（如400的context_length_exceeded、
+# 404的model_not_found、429的quota_exceeded），错误手册中的其他状态码已确定错误分类，无需解析响应体
+_STATUS_NEEDS_BODY = frozenset({400, 404, 429})
+
+# 超过该长度（字符数或字节数）的响应体不放入错误码缓存
+_MAX_CACHED_BODY_LENGTH = 4096
+
+
+@lru_cache(maxsize=256)
+def _extract_error_code(response_body):
+    """
+    从响应体中提取API错误码
+    
+    测试过程中同一服务商常常重复返回相同的错误响应体（如同一条429响应），因此缓存提取结果
+    
+    Args:
+        response_body (Union[str, bytes, None]): 响应体内容
+        
+    Returns:
+        API错误码（通常为str），无法提取时返回None
+    """
+    error_code = None
+    # 空响应体或首个非空白字符不是"{"的响应体（如网关返回的HTML错误页）不可能包含error对象，无需解析
+    if response_body and response_body.lstrip()[:1] in ('{', b'{'):
+        try:
+            response_json = load_json(response_body)
+            if "error" in response_json:
+                error_data = response_json["error"]
+                if "type" in error_data:
+                    error_code = error_data["type"]
+                elif "code" in error_data:
+                    error_code = error_data["code"]
+        except (ValueError, KeyError, TypeError):
+            # ValueError包括json/orjson的JSONDecodeError及字节串响应体不是合法UTF-8时的UnicodeDecodeError
+            pass
+    return error_code
+
 
 def parse_error(status_code, response_body):
     """
@@ -91,37 +196,26 @@ def parse_error(status_code, response_body):
     
     Args:
         status_code (int): HTTP状态码
-        response_body (str): 响应体内容
+        response_body (Union[str, bytes]): 响应体内容
         
     Returns:
-        dict: 包含错误分类和解决方案的字典
+        ParsedError: 包含错误码、错误分类和解决方案的解析结果
     """
-    status_str = str(status_code)
-    error_info = ERROR_HANDBOOK.get(status_str, ERROR_HANDBOOK["unknown"])
+    if status_code not in _STATUS_NEEDS_BODY and status_code in _STATUS_RESULTS:
+        return _STATUS_RESULTS[status_code]
     
-    # 尝试从响应体中提取更详细的错误信息
-    error_code = "unknown"
-    try:
-        import json
-        response_json = json.loads(response_body)
-        if "error" in response_json:
-            error_data = response_json["error"]
-            if "type" in error_data:
-                error_code = error_data["type"]
-            elif "code" in error_data:
-                error_code = error_data["code"]
-            
-            # 如果在ERROR_HANDBOOK中找到特定的API错误码，使用它的分类和解决方案
-            if error_code in ERROR_HANDBOOK:
-                error_info = ERROR_HANDBOOK[error_code]
-    except (json.JSONDecodeError, KeyError, TypeError):
-        pass
+    # 尝试从响应体中提取更详细的错误信息，过长的响应体直接解析而不进入缓存
+    if response_body and len(response_body) > _MAX_CACHED_BODY_LENGTH:
+        error_code = _extract_error_code.__wrapped__(response_body)
+    else:
+        error_code = _extract_error_code(response_body)
     
-    return {
-        "error_code": error_code,
-        "error_category": error_info["category"],
-        "solution": error_info["solution"]
-    }
+    if error_code is None:
+        return _STATUS_RESULTS.get(status_code, _UNKNOWN_RESULT)
+    if isinstance(error_code, str) and error_code in _ERROR_CODE_RESULTS:
+        # 如果在ERROR_HANDBOOK中找到特定的API错误码，使用它的分类和解决方案
+        return _ERROR_CODE_RESULTS[error_code]
+    return _build_result(error_code, ERROR_HANDBOOK_BY_STATUS.get(status_code, _UNKNOWN))
 
 
 def parse_exception(exception_obj):
@@ -132,29 +226,24 @@ def parse_exception(exception_obj):
         exception_obj (Exception): 异常对象
         
     Returns:
-        dict: 包含错误分类和解决方案的字典
+        ParsedError: 包含错误码、错误分类和解决方案的解析结果
     """
-    import socket
-    import ssl
-    from http.client import HTTPException
-    
     error_code = type(exception_obj).__name__
     
-    # 根据异常类型确定错误分类
-    if isinstance(exception_obj, socket.timeout) or "timeout" in str(exception_obj).lower():
-        error_info = ERROR_HANDBOOK["timeout"]
-    elif isinstance(exception_obj, (ConnectionError, socket.error)):
-        error_info = ERROR_HANDBOOK["connection_error"]
-    elif isinstance(exception_obj, ssl.SSLError):
-        error_info = ERROR_HANDBOOK["ssl_error"]
-    elif isinstance(exception_obj, HTTPException):
-        error_info = ERROR_HANDBOOK["unknown"]
-        error_info["solution"] = f"HTTP客户端错误: {str(exception_obj)}. 请检查请求格式和网络连接。"
+    # 根据异常类型确定错误分类，类型未知时再根据异常信息判断是否为超时
+    for cls in type(exception_obj).__mro__:
+        key = _EXCEPTION_TYPE_KEYS.get(cls)
+        if key is not None:
+            break
     else:
-        error_info = ERROR_HANDBOOK["unknown"]
+        key = "timeout" if "timeout" in str(exception_obj).lower() else "unknown"
+    
+    if key == _HTTP_CLIENT_ERROR:
+        # 解决方案包含具体的异常信息，单独构建结果而不使用共享的错误手册条目
+        return ParsedError(
+            error_code,
+            ERROR_HANDBOOK["unknown"]["category"],
+            f"HTTP客户端错误: {exception_obj}. 请检查请求格式和网络连接。"
+        )
     
-    return {
-        "error_code": error_code,
-        "error_category": error_info["category"],
-        "solution": error_info["solution"]
-    }
\ No newline at end of file
+    return _build_result(error_code, ERROR_HANDBOOK[key])
\ No newline at end of file
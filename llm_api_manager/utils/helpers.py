@@ -7,28 +7,95 @@
 
 import json
 import os
+import re
 import sys
+import tempfile
 import time
-from datetime import datetime
-from urllib.parse import urlparse
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 匹配URL中的域名部分（可选的协议前缀之后，到第一个/、?或#为止）
+_DOMAIN_RE = re.compile(r'^(?:https?://)?([^/?#]+)', re.IGNORECASE)
+
+# 预先生成的进度条字符，宽度不超过该值的进度条直接切片
+_BAR_MAX_WIDTH = 200
+_BAR_FULL = '█' * _BAR_MAX_WIDTH
+_BAR_EMPTY = '░' * _BAR_MAX_WIDTH
+
+# 本进程中已确保存在的目录，避免每次写入文件都调用os.makedirs
+_ensured_dirs = set()
+
+
+@lru_cache(maxsize=None)
+def _enable_windows_vt_mode():
+    """
+    为Windows控制台开启虚拟终端（ANSI转义序列）处理，结果在进程内缓存
+    
+    Returns:
+        bool: 开启成功返回True，旧版控制台不支持或调用失败时返回False
+    """
+    try:
+        import ctypes
+        from ctypes import wintypes
+        
+        ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = wintypes.DWORD()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING))
+    except (AttributeError, ImportError, OSError):
+        return False
 
 
 def clear_console():
     """
     清空控制台屏幕
     
-    根据操作系统类型使用不同的命令清空控制台
+    直接输出ANSI转义序列，无需启动子进程；不支持ANSI转义序列的旧版Windows控制台使用cls命令
     """
-    if sys.platform.startswith('win'):
+    if sys.platform.startswith('win') and not _enable_windows_vt_mode():
         os.system('cls')
-    else:
-        os.system('clear')
+        return
+    
+    sys.stdout.write("\x1b[2J\x1b[H")
+    sys.stdout.flush()
 
 
+def clear_stdin():
+    """
+    清空标准输入缓冲区
+    
+    丢弃在耗时操作（如网络请求）期间提前键入的按键，避免其被下一个交互式提示误读
+    """
+    try:
+        if not sys.stdin.isatty():
+            return
+        
+        if sys.platform.startswith('win'):
+            import msvcrt
+            while msvcrt.kbhit():
+                msvcrt.getwch()
+        else:
+            import termios
+            termios.tcflush(sys.stdin.fileno(), termios.TCIFLUSH)
+    except (AttributeError, ImportError, OSError, ValueError):
+        # 标准输入不可用或不是终端时无需清空
+        pass
+
+
+@lru_cache(maxsize=512)
 def extract_domain(url):
     """
     从URL中提取域名
     
+    服务商URL数量有限且会被反复解析，因此缓存结果
+    
     Args:
         url (str): 完整的URL
         
@@ -38,12 +105,8 @@ def extract_domain(url):
     if not url:
         return ""
     
-    # 确保URL有协议前缀
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
-    
-    parsed_url = urlparse(url)
-    return parsed_url.netloc
+    match = _DOMAIN_RE.match(url)
+    return match.group(1) if match else ""
 
 
 def format_timestamp(timestamp=None):
@@ -54,11 +117,9 @@ def format_timestamp(timestamp=None):
         timestamp (float, optional): 时间戳，默认为当前时间
         
     Returns:
-        str: ISO格式的时间字符串
+        str: ISO格式的本地时间字符串（精确到秒）
     """
-    if timestamp is None:
-        timestamp = time.time()
-    return datetime.fromtimestamp(timestamp).isoformat()
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp))
 
 
 def generate_filename(prefix, extension, timestamp=None):
@@ -73,18 +134,55 @@ def generate_filename(prefix, extension, timestamp=None):
     Returns:
         str: 生成的文件名
     """
-    if timestamp is None:
-        timestamp = time.time()
-    
-    dt = datetime.fromtimestamp(timestamp)
-    formatted_time = dt.strftime("%Y%m%d_%H%M%S")
+    formatted_time = time.strftime("%Y%m%d_%H%M%S", time.localtime(timestamp))
     return f"{prefix}_{formatted_time}.{extension}"
 
 
+def dump_json_bytes(data, indent=False):
+    """
+    将数据序列化为UTF-8编码的JSON字节串
+    
+    安装了orjson时使用orjson（速度更快），否则使用标准库json
+    
+    Args:
+        data: 要序列化的数据
+        indent (bool): 是否使用2个空格缩进，默认为False（紧凑格式）
+        
+    Returns:
+        bytes: JSON字节串
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def load_json(data):
+    """
+    解析JSON字符串或字节串
+    
+    安装了orjson时使用orjson，否则使用标准库json
+    
+    Args:
+        data (Union[str, bytes]): JSON字符串或字节串
+        
+    Returns:
+        解析得到的数据
+        
+    Raises:
+        ValueError: 内容不是合法的JSON时抛出（json.JSONDecodeError或orjson.JSONDecodeError）
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def save_to_json(data, filepath):
     """
     将数据保存为JSON文件
     
+    数据一次性序列化为字节串（安装了orjson时使用orjson）后原子地写入
+    
     Args:
         data: 要保存的数据（字典或列表）
         filepath (str): 文件保存路径
@@ -93,21 +191,67 @@ def save_to_json(data, filepath):
         bool: 保存成功返回True，否则返回False
     """
     try:
-        # 确保目录存在
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # 先写入临时文件再替换目标文件，写入中断时不会留下不完整的文件
+        write_file_atomic(filepath, dump_json_bytes(data, indent=True))
         return True
     except Exception as e:
         print(f"保存JSON文件失败: {e}")
         return False
 
 
+def write_file_atomic(filepath, data):
+    """
+    原子地写入文件
+    
+    先写入同目录下唯一命名的临时文件，再替换目标文件，写入失败时删除临时文件；
+    目标目录不存在时自动创建。目标文件已存在时保留其权限
+    
+    Args:
+        filepath (str): 文件保存路径
+        data (bytes): 文件内容
+        
+    Raises:
+        OSError: 写入失败时抛出
+    """
+    directory = os.path.dirname(filepath)
+    if directory and directory not in _ensured_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _ensured_dirs.add(directory)
+    
+    prefix = os.path.basename(filepath) + '.'
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=prefix, suffix='.tmp', dir=directory or '.')
+    except FileNotFoundError:
+        if not directory:
+            raise
+        # 目录在本进程中被删除，重新创建后重试一次
+        _ensured_dirs.discard(directory)
+        os.makedirs(directory, exist_ok=True)
+        _ensured_dirs.add(directory)
+        fd, tmp_path = tempfile.mkstemp(prefix=prefix, suffix='.tmp', dir=directory)
+    
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        try:
+            os.chmod(tmp_path, os.stat(filepath).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 def load_from_json(filepath, default=None):
     """
     从JSON文件加载数据
     
+    一次性读取文件字节后解析（安装了orjson时使用orjson）
+    
     Args:
         filepath (str): 文件路径
         default: 文件不存在或加载失败时返回的默认值
@@ -115,17 +259,34 @@ def load_from_json(filepath, default=None):
     Returns:
         加载的数据或默认值
     """
-    if not os.path.exists(filepath):
-        return default
-    
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            return load_json(f.read())
+    except FileNotFoundError:
+        # 文件不存在时静默返回默认值
+        return default
     except Exception as e:
         print(f"加载JSON文件失败: {e}")
         return default
 
 
+@lru_cache(maxsize=None)
+def _pyperclip():
+    """
+    获取pyperclip模块
+    
+    首次使用剪贴板时才导入，避免所有导入本模块的代码（如配置管理器和CLI启动）承担导入开销；结果在进程内缓存
+    
+    Returns:
+        pyperclip模块，未安装时返回None
+    """
+    try:
+        import pyperclip
+    except ImportError:
+        return None
+    return pyperclip
+
+
 def copy_to_clipboard(text):
     """
     将文本复制到剪贴板
@@ -136,18 +297,40 @@ def copy_to_clipboard(text):
     Returns:
         bool: 复制成功返回True，否则返回False
     """
+    pyperclip = _pyperclip()
+    if pyperclip is None:
+        print("未安装pyperclip库，无法复制到剪贴板。请使用pip install pyperclip安装。")
+        return False
+    
     try:
-        import pyperclip
         pyperclip.copy(text)
         return True
-    except ImportError:
-        print("未安装pyperclip库，无法复制到剪贴板。请使用pip install pyperclip安装。")
-        return False
     except Exception as e:
         print(f"复制到剪贴板失败: {e}")
         return False
 
 
+@lru_cache(maxsize=None)
+def clipboard_available():
+    """
+    检查剪贴板是否可用
+    
+    通过读取剪贴板探测pyperclip及其后端是否可用（不会改动剪贴板内容），结果在进程内缓存
+    
+    Returns:
+        bool: 剪贴板可用返回True，否则返回False
+    """
+    pyperclip = _pyperclip()
+    if pyperclip is None:
+        return False
+    
+    try:
+        pyperclip.paste()
+        return True
+    except Exception:
+        return False
+
+
 def create_progress_bar(current, total, width=50):
     """
     创建ASCII进度条
@@ -162,6 +345,6 @@ def create_progress_bar(current, total, width=50):
     """
     progress = min(1.0, current / total if total > 0 else 1.0)
     filled_width = int(width * progress)
-    bar = '█' * filled_width + '░' * (width - filled_width)
-    percentage = progress * 100
-    return f"[{bar}] {percentage:.1f}% ({current}/{total})"
\ No newline at end of file
+    if width <= _BAR_MAX_WIDTH:
+        return f"[{_BAR_FULL[:filled_width]}{_BAR_EMPTY[:width - filled_width]}] {progress * 100:.1f}% ({current}/{total})"
+    return f"[{'█' * filled_width}{'░' * (width - filled_width)}] {progress * 100:.1f}% ({current}/{total})"
\ No newline at end of file
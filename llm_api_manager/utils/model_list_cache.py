@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+模型列表缓存模块
+
+将从服务商API自动获取的模型列表持久化到本地，避免重复的网络请求。
+"""
+
+import os
+import re
+import time
+from typing import List, Optional
+
+from .helpers import load_from_json, save_to_json
+
+# 设置该环境变量后不再访问服务商API获取模型列表，仅使用本地缓存（适用于离线环境）
+DISABLE_REMOTE_MODELS_ENV = 'LLM_API_DISABLE_REMOTE_MODELS'
+
+
+def remote_models_disabled() -> bool:
+    """
+    检查是否禁用了从API获取模型列表
+    
+    Returns:
+        bool: 环境变量LLM_API_DISABLE_REMOTE_MODELS为真值时返回True
+    """
+    value = os.environ.get(DISABLE_REMOTE_MODELS_ENV, '')
+    return value.strip().lower() not in ('', '0', 'false', 'no')
+
+
+class ModelListCache:
+    """
+    模型列表缓存类
+    
+    每个服务商的模型列表保存为缓存目录下的一个JSON文件，
+    并以同名的.last_sync标记文件的修改时间记录最近一次同步时间。
+    """
+    
+    # 默认缓存有效期（秒）
+    DEFAULT_MAX_AGE = 24 * 60 * 60
+    
+    def __init__(self, cache_dir: str = None):
+        """
+        初始化模型列表缓存
+        
+        Args:
+            cache_dir (str, optional): 缓存目录，默认为~/.llm-api-manager/cache
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser('~'), '.llm-api-manager', 'cache')
+        self.cache_dir = cache_dir
+    
+    def _cache_paths(self, provider_name: str):
+        """
+        获取服务商对应的缓存文件和同步标记文件路径
+        
+        Args:
+            provider_name (str): 服务商名称
+            
+        Returns:
+            Tuple[str, str]: (缓存文件路径, 同步标记文件路径)
+        """
+        # 替换文件名中不安全的字符
+        safe_name = re.sub(r'[^\w.-]', '_', provider_name)
+        base = os.path.join(self.cache_dir, safe_name)
+        return base + '.json', base + '.last_sync'
+    
+    def get(self, provider_name: str, base_url: str = '', max_age: Optional[float] = DEFAULT_MAX_AGE) -> Optional[List[str]]:
+        """
+        读取服务商的缓存模型列表
+        
+        Args:
+            provider_name (str): 服务商名称
+            base_url (str, optional): 服务商基础URL，与缓存记录不一致时视为未命中
+            max_age (Optional[float], optional): 最大缓存时长（秒），为None时忽略缓存时长
+            
+        Returns:
+            Optional[List[str]]: 缓存的模型ID列表，未命中或已过期时返回None
+        """
+        cache_file, marker_file = self._cache_paths(provider_name)
+        
+        if max_age is not None:
+            try:
+                last_sync = os.path.getmtime(marker_file)
+            except OSError:
+                return None
+            if time.time() - last_sync > max_age:
+                return None
+        
+        data = load_from_json(cache_file)
+        if not isinstance(data, dict) or data.get('base_url', '') != base_url:
+            return None
+        
+        return data.get('models')
+    
+    def set(self, provider_name: str, models: List[str], base_url: str = '') -> bool:
+        """
+        写入服务商的模型列表缓存并更新同步标记
+        
+        Args:
+            provider_name (str): 服务商名称
+            models (List[str]): 模型ID列表
+            base_url (str, optional): 服务商基础URL
+            
+        Returns:
+            bool: 写入成功返回True，否则返回False
+        """
+        cache_file, marker_file = self._cache_paths(provider_name)
+        
+        if not save_to_json({'base_url': base_url, 'models': models}, cache_file):
+            return False
+        
+        try:
+            with open(marker_file, 'a'):
+                pass
+            os.utime(marker_file, None)
+            return True
+        except OSError as e:
+            print(f"更新模型列表缓存同步标记失败: {e}")
+            return False
\ No newline at end of file